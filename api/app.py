@@ -1,8 +1,23 @@
+from contextlib import asynccontextmanager
+
 from fastapi.middleware.cors import CORSMiddleware
 import fastapi
 from api.routers.admin import router as admin_router
 from api.routers.user import router as user_router
-app = fastapi.FastAPI()
+from services.ingest_queue import ingest_queue
+from core.invalidation import invalidation_bus
+
+
+@asynccontextmanager
+async def lifespan(app: fastapi.FastAPI):
+    ingest_queue.start()
+    invalidation_bus.start()
+    yield
+    await invalidation_bus.stop()
+    await ingest_queue.stop()
+
+
+app = fastapi.FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
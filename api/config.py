@@ -13,6 +13,19 @@ class Password:
     salt: str = environ.var()
     token_key: str = environ.var()
 
+@environ.config()
+class Ingest:
+    max_pending: int = environ.var(5000, converter=int)
+    batch_size: int = environ.var(200, converter=int)
+    flush_interval: float = environ.var(1.0, converter=float)
+
+@environ.config()
+class Video:
+    resolve_timeout: float = environ.var(10.0, converter=float)
+    cache_ttl: float = environ.var(3600.0, converter=float)
+    persist: bool = environ.bool_var(True)
+    max_fetches: int = environ.var(8, converter=int)
+
 
 @environ.config(prefix="")
 class Config:
@@ -22,6 +35,8 @@ class Config:
     db: str = environ.var()
     jwt: Jwt = environ.group(Jwt)
     password: Password = environ.group(Password)
+    ingest: Ingest = environ.group(Ingest)
+    video: Video = environ.group(Video)
 
 
 cfg: Config = environ.to_config(Config)
\ No newline at end of file
@@ -6,10 +6,12 @@ from jose import JWTError
 from sqlalchemy.ext.asyncio import AsyncConnection
 
 from api.config import cfg
+from core.cache import api_key_cache, admin_principal_cache
 from core.db import engine
-from exceptions import AdminNotFoundError
+from exceptions import AdminNotFoundError, AdminIsNotLoginError
 from facades.admin import Admin
-from helpers.token_maker import TokenMaker
+from helpers.token_maker import token_maker
+from services.admin import apikey_digest
 
 admin_login_schema = OAuth2PasswordBearer(
     tokenUrl="/admin/login", scheme_name="Admin", auto_error=True
@@ -27,7 +29,7 @@ async def get_name(token: str = Depends(admin_login_schema)) -> str:
     get name from token
     """
     try:
-        new_token = TokenMaker().verify_token(token, cfg.password.token_key)
+        new_token = token_maker.verify_token(token, cfg.password.token_key)
         return new_token["uuid"]
     except JWTError as e:
         raise HTTPException(401, {"msg": str(e)}) from e
@@ -36,12 +38,34 @@ async def get_id(
     conn: AsyncConnection = Depends(get_connection), uuid_: str = Depends(get_name)
 ) -> AsyncIterator[Tuple[int, AsyncConnection]]:
     """
-    get id by token
+    get id by token, id admin di-cache per uuid
     """
-    a = Admin(conn)
-    try:
-        row = await a.read_by_name(uuid_)
-    except AdminNotFoundError as e:
-        raise HTTPException(401, {"msg": "silahkan login"}) from e
+    admin_id = admin_principal_cache.get(uuid_)
+    if admin_id is None:
+        a = Admin(conn)
+        try:
+            row = await a.read_by_name(uuid_)
+        except AdminNotFoundError as e:
+            raise HTTPException(401, {"msg": "silahkan login"}) from e
+        if row is None:
+            raise HTTPException(401, {"msg": "silahkan login"})
+
+        admin_id = row.id
+        admin_principal_cache.set(uuid_, admin_id)
+
+    yield admin_id, conn
+
+async def verify_crawler(api_key: str) -> str:
+    """
+    validasi api key crawler, tanpa query ke database kalau api key sudah ada di cache
+    """
+    if api_key_cache.get(apikey_digest(api_key)):
+        return api_key
+
+    async with engine.begin() as conn:
+        try:
+            await Admin(conn).authorize_crawler(api_key)
+        except AdminIsNotLoginError as e:
+            raise HTTPException(401, detail="Admin is not login") from e
 
-    yield row.id, conn
\ No newline at end of file
+    return api_key
@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
@@ -7,14 +7,18 @@ from sqlalchemy.ext.asyncio import AsyncConnection
 
 from api.config import cfg
 from core.db import engine
-from exceptions import UserNotFoundError
 from facades.users import User
-from helpers.token_maker import TokenMaker
+from helpers.token_maker import token_maker
+from schemas.users import UserPrincipalSchema
 
 user_login_schema = OAuth2PasswordBearer(
     tokenUrl="/user/login", scheme_name="User", auto_error=True
 )
 
+optional_user_login_schema = OAuth2PasswordBearer(
+    tokenUrl="/user/login", scheme_name="User", auto_error=False
+)
+
 async def get_connection() -> AsyncConnection:
     """
     Method to get database connection
@@ -22,31 +26,51 @@ async def get_connection() -> AsyncConnection:
     async with engine.begin() as conn:
         yield conn
 
-async def get_user_id(
+async def get_current_user(
     token: str = Depends(user_login_schema),
     conn: AsyncConnection = Depends(get_connection)
-) -> Tuple[str, AsyncConnection]:
+) -> Tuple[UserPrincipalSchema, AsyncConnection]:
     """
-    Get user UUID from JWT token
+    Get the authenticated user (id, uuid, email) from JWT token
+
+    The user row is cached per uuid for a short time, and FastAPI resolves this
+    dependency once per request, so routes must not look the user up again.
     """
     try:
-        token_maker = TokenMaker()
         decoded = token_maker.verify_token(token, cfg.password.token_key)
         uuid = decoded.get("uuid")
-        
+
         if not uuid:
             raise HTTPException(status_code=401, detail="Invalid token")
-        
-        # Verify user exists
-        user_facade = User(conn)
-        user = await user_facade.get_user_by_uuid(uuid)
-        
+
+        user = await User(conn).get_principal(uuid)
+
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
-        
-        return uuid, conn
-        
+
+        return user, conn
+
+    except HTTPException:
+        raise
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
     except Exception as e:
-        raise HTTPException(status_code=401, detail="Authentication failed") 
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Authentication failed")
+
+
+async def get_optional_user_uuid(token: Optional[str] = Depends(optional_user_login_schema)) -> Optional[str]:
+    """
+    Get user UUID from JWT token for public endpoints
+
+    ``None`` when no token is sent or the token is invalid or expired, so a stale token
+    in the client degrades to the anonymous response instead of breaking a public page.
+    """
+    if token is None:
+        return None
+
+    try:
+        decoded = token_maker.verify_token(token, cfg.password.token_key)
+    except (HTTPException, JWTError):
+        return None
+
+    return decoded.get("uuid") or None
@@ -1,15 +1,20 @@
-from typing import Tuple
+from typing import List, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncConnection
 
 from api.config import cfg
-from api.depends.admin import get_id
+from api.depends.admin import get_id, verify_crawler
+from core.cache import cache_stats
+from core.invalidation import invalidation_bus
 from core.db import engine
-from exceptions import AdminPasswordError, AdminIsNotLoginError
+from exceptions import AdminPasswordError, AdminIsNotLoginError, IngestQueueFullError, PasswordHasherBusyError
 from facades.admin import Admin
-from helpers.authentication import BasicSalt, PasswordHasher
+from helpers.authentication import BasicSalt, PasswordHasher, hashing_pool
+from services.episode_video import episode_video_resolver
+from services.ingest_queue import ingest_queue
+from services.site_settings import get_site_settings
 from schemas.admin import AddCrawlerSettingsSchema, AdminLoginSchema, CrawlerSettingsResponseSchema, SettingsSiteSchema, AddCrawlersSchema, AnimeBase
 
 router = APIRouter(prefix='/admin', tags=["Admin"])
@@ -35,6 +40,8 @@ async def login(data: OAuth2PasswordRequestForm = Depends()):
             )
         except AdminPasswordError:
             raise HTTPException(401, detail="Login Failed")
+        except PasswordHasherBusyError:
+            raise HTTPException(503, detail="Server is busy, try again", headers={"Retry-After": "1"})
 
 @router.get("/me")
 async def get_me(admin_conn: Tuple[int, AsyncConnection] = Depends(get_id)):
@@ -56,8 +63,10 @@ async def get_me(data: SettingsSiteSchema, admin_conn: Tuple[int, AsyncConnectio
 
 @router.get("/settings")
 async def get_settings():
-    async with engine.begin() as conn:
-        return await Admin(conn).read_settings(1)
+    """
+    Site settings dari cache in-process, di-refresh lewat NOTIFY saat settings diubah
+    """
+    return await get_site_settings(1)
 
 
 @router.post("/add-crawler")
@@ -75,13 +84,47 @@ async def listing_crawler(admin_conn: Tuple[int, AsyncConnection] = Depends(get_
     return await Admin(conn).listing_crawler()
 
 
-@router.post("/add-anime")
-async def add_or_update_anime(api_key: str, data: AnimeBase):
+@router.post("/add-anime", status_code=202)
+async def add_or_update_anime(data: AnimeBase, api_key: str = Depends(verify_crawler)):
+    """
+    Masukkan anime ke antrian ingest lalu langsung balas 202, ditulis ke database per batch.
+    Kalau antrian penuh balas 429 dengan header ``Retry-After``.
+    """
+    try:
+        return ingest_queue.submit(data)
+    except IngestQueueFullError as e:
+        raise HTTPException(429, detail="Ingest queue is full", headers={"Retry-After": str(e.retry_after)})
+
+
+@router.get("/known-episodes")
+async def known_episodes(title: str, api_key: str = Depends(verify_crawler)):
+    """
+    Nomor episode yang sudah punya ``video_url`` untuk satu title, supaya crawler
+    cukup membuka halaman episode yang baru
+    """
     async with engine.begin() as conn:
-        try:
-            return await Admin(conn).add_or_update_anime(api_key, data)
-        except AdminIsNotLoginError:
-            raise HTTPException(401, detail="Admin is not login")
+        return await Admin(conn).known_episodes(title)
+
+
+@router.post("/add-anime/batch")
+async def add_anime_batch(
+    data: List[AnimeBase] = Body(..., max_length=500), api_key: str = Depends(verify_crawler)
+):
+    """
+    Upsert banyak anime sekaligus (maksimal 500), status per item sesuai urutan request
+    """
+    async with engine.begin() as conn:
+        return await Admin(conn).ingest_batch(data)
+
+
+@router.post("/add-anime/delta")
+async def add_anime_delta(data: AnimeBase, api_key: str = Depends(verify_crawler)):
+    """
+    Merge anime dari crawler; ``episodes`` cukup berisi episode baru atau yang berubah.
+    Response berisi status ``created``/``updated``/``unchanged`` dan jumlah episode yang ditulis.
+    """
+    async with engine.begin() as conn:
+        return await Admin(conn).ingest_anime(data)
         
 @router.post("/add-crawler-settings")
 async def add_crawler_settings(data: AddCrawlerSettingsSchema, admin_conn: Tuple[int, AsyncConnection] = Depends(get_id)):
@@ -106,6 +149,41 @@ async def get_url_for_crawler(apikey:str, crawler_name: str):
     async with engine.begin() as conn:
         return await Admin(conn).get_url_for_crawler(apikey, crawler_name)
     
+@router.get("/cache-stats")
+async def get_cache_stats(admin_conn: Tuple[int, AsyncConnection] = Depends(get_id)):
+    """
+    Hit/miss/eviction counter cache in-process milik worker yang melayani request
+    """
+    return cache_stats()
+
+@router.get("/hashing-stats")
+async def get_hashing_stats(admin_conn: Tuple[int, AsyncConnection] = Depends(get_id)):
+    """
+    Antrian dan latency pool bcrypt milik worker yang melayani request
+    """
+    return hashing_pool.stats()
+
+@router.get("/invalidation-stats")
+async def get_invalidation_stats(admin_conn: Tuple[int, AsyncConnection] = Depends(get_id)):
+    """
+    Status listener dan counter invalidation bus milik worker yang melayani request
+    """
+    return invalidation_bus.stats()
+
+@router.get("/episode-video-stats")
+async def get_episode_video_stats(admin_conn: Tuple[int, AsyncConnection] = Depends(get_id)):
+    """
+    Counter resolve video url on-demand milik worker yang melayani request
+    """
+    return episode_video_resolver.stats()
+
+@router.get("/ingest-status")
+async def get_ingest_status(admin_conn: Tuple[int, AsyncConnection] = Depends(get_id)):
+    """
+    Kedalaman antrian ingest dan latency flush milik worker yang melayani request
+    """
+    return ingest_queue.status()
+
 @router.delete("/delete-crawler-settings")
 async def delete_crawler_settings(crawler_id: int, admin_conn: Tuple[int, AsyncConnection] = Depends(get_id)):
     admin_id, conn = admin_conn
@@ -1,37 +1,127 @@
-from typing import Tuple
+from typing import Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncConnection
 from sqlalchemy.util import await_only
 
 from api.config import cfg
-from api.depends.user import get_user_id
+from api.depends.user import get_current_user, get_optional_user_uuid
 from core.db import engine
-from exceptions import AdminPasswordError, AdminIsNotLoginError, UserAlreadyExistsError, UserNotFoundError, UserPasswordError
+from exceptions import AdminPasswordError, AdminIsNotLoginError, UserAlreadyExistsError, UserNotFoundError, UserPasswordError, \
+    InvalidCursorError, AnimeNotFoundError, PasswordHasherBusyError, EpisodeNotFoundError, EpisodeVideoUnavailableError
 from facades.admin import Admin
 from facades.users import User
 from helpers.authentication import BasicSalt, PasswordHasher
-from schemas.admin import AdminLoginSchema, SettingsSiteSchema, AddCrawlersSchema, AnimeBase, FilterAnime
+from helpers.http_cache import make_etag, cache_headers, is_not_modified, not_modified_response
+from schemas.admin import AdminLoginSchema, SettingsSiteSchema, AddCrawlersSchema, AnimeBase, FilterAnime, SearchAnime, \
+    FilterEpisodes
 from facades.admin import AdminCRUD
-from schemas.users import UserLoginSchema, UserRegisterSchema, AddBookmarkSchema, BookmarkResponseSchema, UserProfileSchema, UserUpdateProfileSchema, UserChangePasswordSchema
+from services.episode_video import episode_video_resolver
+from schemas.users import UserLoginSchema, UserRegisterSchema, AddBookmarkSchema, BookmarkResponseSchema, UserProfileSchema, UserUpdateProfileSchema, UserChangePasswordSchema, \
+    UserPrincipalSchema, BookmarkCheckSchema, BookmarkCheckResponseSchema, \
+    BookmarkBulkAddSchema, BookmarkBulkAddResponseSchema, BookmarkBulkRemoveSchema, BookmarkBulkRemoveResponseSchema, \
+    BookmarkListingResponse, FilterBookmarks
 
 router = APIRouter(prefix='/user', tags=["User"])
 
 
 @router.get('/list-anime')
-async def listing_anime(data: FilterAnime = Depends()):
-    """Get list of anime with filtering options"""
+async def listing_anime(
+    request: Request,
+    response: Response,
+    data: FilterAnime = Depends(),
+    user_uuid: Optional[str] = Depends(get_optional_user_uuid)
+):
+    """
+    Get list of anime with filtering options.
+    With a user token every item also carries ``is_bookmarked`` (response is then not cacheable).
+    """
+    async with engine.begin() as conn:
+        crud = AdminCRUD(conn)
+
+        # A token of a deleted user is treated as anonymous too
+        user = await User(conn).get_principal(user_uuid) if user_uuid is not None else None
+        if user:
+            try:
+                result = await crud.listing_anime(data)
+            except InvalidCursorError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+
+            bookmarked = set(await User(conn).bookmarked_content_ids(user.id, [anime.id for anime in result.data]))
+            for anime in result.data:
+                anime.is_bookmarked = anime.id in bookmarked
+
+            response.headers.update({"Cache-Control": "private, no-store", "Vary": "Authorization"})
+            return result
+
+        last_modified, revision = await crud.catalog_version()
+        etag = make_etag("list-anime", sorted(data.model_dump(mode="json").items()), last_modified, revision)
+        headers = {**cache_headers(etag, last_modified, max_age=30), "Vary": "Authorization"}
+
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(headers)
+
+        try:
+            result = await crud.listing_anime(data)
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    response.headers.update(headers)
+    return result
+
+
+@router.get('/search')
+async def search_anime(data: SearchAnime = Depends()):
+    """Full-text search anime by title, studio, genre and synopsis"""
     async with engine.begin() as conn:
-        return await AdminCRUD(conn).listing_anime(data)
+        return await AdminCRUD(conn).search_anime(data)
 
 
 @router.get('/anime/{anime_id}')
-async def get_anime(anime_id: int):
+async def get_anime(anime_id: int, request: Request, response: Response):
     """Get detailed information about a specific anime"""
     async with engine.begin() as conn:
-        return await AdminCRUD(conn).detail_anime(anime_id)
-    
+        crud = AdminCRUD(conn)
+        try:
+            version = await crud.anime_version(anime_id)
+            etag = make_etag("anime", anime_id, version)
+            headers = cache_headers(etag, version, max_age=60)
+
+            if is_not_modified(request, etag, version):
+                return not_modified_response(headers)
+
+            result = await crud.detail_anime(anime_id)
+        except AnimeNotFoundError:
+            raise HTTPException(status_code=404, detail="Anime not found")
+
+    response.headers.update(headers)
+    return result
+
+
+@router.get('/anime/{anime_id}/episodes')
+async def get_anime_episodes(anime_id: int, data: FilterEpisodes = Depends()):
+    """Get episodes of an anime, paginated with a cursor"""
+    async with engine.begin() as conn:
+        try:
+            return await AdminCRUD(conn).listing_episodes(anime_id, data)
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get('/anime/{anime_id}/episodes/{number}/video')
+async def get_episode_video(anime_id: int, number: str):
+    """
+    Video URL of one episode, resolved from the episode page the first time it is requested.
+    Concurrent requests for the same episode share one fetch; results are cached.
+    """
+    try:
+        return await episode_video_resolver.resolve(anime_id, number)
+    except EpisodeNotFoundError:
+        raise HTTPException(status_code=404, detail="Episode not found")
+    except EpisodeVideoUnavailableError:
+        raise HTTPException(status_code=502, detail="Video URL could not be resolved")
+
 
 @router.post('/register')
 async def register(user: UserRegisterSchema):
@@ -41,6 +131,8 @@ async def register(user: UserRegisterSchema):
             return await User(conn).register(user)
         except UserAlreadyExistsError as e:
             raise HTTPException(status_code=400, detail="User already exists")
+        except PasswordHasherBusyError:
+            raise HTTPException(status_code=503, detail="Server is busy, try again", headers={"Retry-After": "1"})
     
 @router.post('/login')
 async def login(user: OAuth2PasswordRequestForm = Depends()):
@@ -50,22 +142,19 @@ async def login(user: OAuth2PasswordRequestForm = Depends()):
             return await User(conn).login(user)
         except (UserPasswordError, UserNotFoundError) as e:
             raise HTTPException(status_code=400, detail="Invalid credentials")
+        except PasswordHasherBusyError:
+            raise HTTPException(status_code=503, detail="Server is busy, try again", headers={"Retry-After": "1"})
 
 
 # User Profile Endpoints
 @router.get('/me', response_model=UserProfileSchema)
 async def get_user_profile(
-    user_auth: Tuple[str, AsyncConnection] = Depends(get_user_id)
+    user_auth: Tuple[UserPrincipalSchema, AsyncConnection] = Depends(get_current_user)
 ):
     """Get current user's profile information"""
-    user_uuid, conn = user_auth
+    user, conn = user_auth
     
     try:
-        # Get user details
-        user = await User(conn).get_user_by_uuid(user_uuid)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
         profile = await User(conn).get_user_profile(user.id)
         return profile
         
@@ -78,17 +167,12 @@ async def get_user_profile(
 @router.put('/me', response_model=dict)
 async def update_user_profile(
     profile_data: UserUpdateProfileSchema,
-    user_auth: Tuple[str, AsyncConnection] = Depends(get_user_id)
+    user_auth: Tuple[UserPrincipalSchema, AsyncConnection] = Depends(get_current_user)
 ):
     """Update current user's profile information"""
-    user_uuid, conn = user_auth
+    user, conn = user_auth
     
     try:
-        # Get user details
-        user = await User(conn).get_user_by_uuid(user_uuid)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
         # Check if email is already taken by another user
         existing_user = await User(conn).get_user_by_email(profile_data.email)
         if existing_user and existing_user.id != user.id:
@@ -113,17 +197,12 @@ async def update_user_profile(
 @router.put('/me/password', response_model=dict)
 async def change_user_password(
     password_data: UserChangePasswordSchema,
-    user_auth: Tuple[str, AsyncConnection] = Depends(get_user_id)
+    user_auth: Tuple[UserPrincipalSchema, AsyncConnection] = Depends(get_current_user)
 ):
     """Change current user's password"""
-    user_uuid, conn = user_auth
+    user, conn = user_auth
     
     try:
-        # Get user details
-        user = await User(conn).get_user_by_uuid(user_uuid)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
         success = await User(conn).change_user_password(user.id, password_data)
         
         if not success:
@@ -135,6 +214,8 @@ async def change_user_password(
         
     except HTTPException:
         raise
+    except PasswordHasherBusyError:
+        raise HTTPException(status_code=503, detail="Server is busy, try again", headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to change password")
 
@@ -143,17 +224,12 @@ async def change_user_password(
 @router.post('/bookmarks', response_model=dict)
 async def add_bookmark(
     bookmark_data: AddBookmarkSchema,
-    user_auth: Tuple[str, AsyncConnection] = Depends(get_user_id)
+    user_auth: Tuple[UserPrincipalSchema, AsyncConnection] = Depends(get_current_user)
 ):
     """Add an anime to user's bookmarks"""
-    user_uuid, conn = user_auth
+    user, conn = user_auth
     
     try:
-        # Get user details
-        user = await User(conn).get_user_by_uuid(user_uuid)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
         bookmark_id = await User(conn).add_bookmark(user.id, bookmark_data)
         
         return {
@@ -166,20 +242,45 @@ async def add_bookmark(
         raise HTTPException(status_code=500, detail="Failed to add bookmark")
 
 
+@router.post('/bookmarks/bulk', response_model=BookmarkBulkAddResponseSchema)
+async def add_bookmarks_bulk(
+    data: BookmarkBulkAddSchema,
+    user_auth: Tuple[UserPrincipalSchema, AsyncConnection] = Depends(get_current_user)
+):
+    """Add up to 1000 bookmarks in one transaction, e.g. to import a watchlist"""
+    user, conn = user_auth
+
+    try:
+        return await User(conn).add_bookmarks(user.id, data.bookmarks)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to add bookmarks")
+
+
+@router.post('/bookmarks/bulk-delete', response_model=BookmarkBulkRemoveResponseSchema)
+async def remove_bookmarks_bulk(
+    data: BookmarkBulkRemoveSchema,
+    user_auth: Tuple[UserPrincipalSchema, AsyncConnection] = Depends(get_current_user)
+):
+    """Remove up to 1000 bookmarks in one transaction"""
+    user, conn = user_auth
+
+    try:
+        return await User(conn).remove_bookmarks(user.id, data.content_ids)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to remove bookmarks")
+
+
 @router.delete('/bookmarks/{content_id}')
 async def remove_bookmark(
     content_id: int,
-    user_auth: Tuple[str, AsyncConnection] = Depends(get_user_id)
+    user_auth: Tuple[UserPrincipalSchema, AsyncConnection] = Depends(get_current_user)
 ):
     """Remove an anime from user's bookmarks"""
-    user_uuid, conn = user_auth
+    user, conn = user_auth
     
     try:
-        # Get user details
-        user = await User(conn).get_user_by_uuid(user_uuid)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
         removed = await User(conn).remove_bookmark(user.id, content_id)
         
         if not removed:
@@ -198,17 +299,12 @@ async def remove_bookmark(
 
 @router.get('/bookmarks', response_model=list[BookmarkResponseSchema])
 async def get_user_bookmarks(
-    user_auth: Tuple[str, AsyncConnection] = Depends(get_user_id)
+    user_auth: Tuple[UserPrincipalSchema, AsyncConnection] = Depends(get_current_user)
 ):
     """Get all bookmarks for the authenticated user"""
-    user_uuid, conn = user_auth
+    user, conn = user_auth
     
     try:
-        # Get user details
-        user = await User(conn).get_user_by_uuid(user_uuid)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
         bookmarks = await User(conn).get_bookmarks(user.id)
         return bookmarks
         
@@ -216,20 +312,51 @@ async def get_user_bookmarks(
         raise HTTPException(status_code=500, detail="Failed to get bookmarks")
 
 
+@router.post('/bookmarks/check', response_model=BookmarkCheckResponseSchema)
+async def check_bookmark_status_batch(
+    data: BookmarkCheckSchema,
+    user_auth: Tuple[UserPrincipalSchema, AsyncConnection] = Depends(get_current_user)
+):
+    """Return which of the given anime ids (max 500) are bookmarked by the user"""
+    user, conn = user_auth
+
+    try:
+        bookmarked = await User(conn).bookmarked_content_ids(user.id, data.content_ids)
+        return BookmarkCheckResponseSchema(bookmarked=sorted(bookmarked))
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to check bookmark status")
+
+
+@router.get('/bookmarks/page', response_model=BookmarkListingResponse)
+async def get_user_bookmarks_page(
+    data: FilterBookmarks = Depends(),
+    user_auth: Tuple[UserPrincipalSchema, AsyncConnection] = Depends(get_current_user)
+):
+    """
+    Get the user's bookmarks newest first, one page at a time.
+    Pass ``next_cursor`` back as ``cursor``; ``compact=true`` skips anime title/banner/status.
+    """
+    user, conn = user_auth
+
+    try:
+        return await User(conn).listing_bookmarks(user.id, data)
+
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to get bookmarks")
+
+
 @router.get('/bookmarks/check/{content_id}')
 async def check_bookmark_status(
     content_id: int,
-    user_auth: Tuple[str, AsyncConnection] = Depends(get_user_id)
+    user_auth: Tuple[UserPrincipalSchema, AsyncConnection] = Depends(get_current_user)
 ):
     """Check if a specific anime is bookmarked by the user"""
-    user_uuid, conn = user_auth
+    user, conn = user_auth
     
     try:
-        # Get user details
-        user = await User(conn).get_user_by_uuid(user_uuid)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
         is_bookmarked = await User(conn).check_bookmark_exists(user.id, content_id)
         
         return {
@@ -0,0 +1,48 @@
+from typing import Any, Dict
+
+from helpers.cache import TTLCache
+
+# total listing anime per kombinasi filter, di-clear setiap ada write ke animes
+anime_totals_cache = TTLCache(maxsize=1024, ttl=300)
+
+# DetailAnimeResponseSchema per anime id, di-invalidate saat anime tersebut di-update
+anime_detail_cache = TTLCache(maxsize=2048, ttl=600)
+
+# sha256 api key crawler yang valid, di-clear saat api key di-generate ulang
+api_key_cache = TTLCache(maxsize=256, ttl=300)
+
+# user yang sedang login (UserPrincipalSchema) per uuid, di-invalidate saat user di-update/dihapus
+user_principal_cache = TTLCache(maxsize=4096, ttl=60)
+
+# id admin per uuid admin
+admin_principal_cache = TTLCache(maxsize=64, ttl=60)
+
+# claims JWT yang signature-nya sudah diverifikasi, per sha256(secret + token)
+token_claims_cache = TTLCache(maxsize=8192, ttl=300)
+
+# AdminSettingsResponseSchema per id, di-refresh lewat invalidation bus di semua worker
+site_settings_cache = TTLCache(maxsize=8, ttl=24 * 3600)
+
+# video_url episode per (anime_id, number) yang di-resolve saat pertama kali ditonton,
+# TTL per entry diambil dari ``cfg.video.cache_ttl``
+episode_video_cache = TTLCache(maxsize=16384, ttl=3600)
+
+
+# semua cache di atas, untuk stats dan flush total oleh invalidation bus
+caches: Dict[str, TTLCache] = {
+    "anime_totals": anime_totals_cache,
+    "anime_detail": anime_detail_cache,
+    "api_key": api_key_cache,
+    "user_principal": user_principal_cache,
+    "admin_principal": admin_principal_cache,
+    "token_claims": token_claims_cache,
+    "site_settings": site_settings_cache,
+    "episode_video": episode_video_cache,
+}
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    counter semua cache in-process di worker ini
+    """
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -0,0 +1,211 @@
+import inspect
+import json
+import logging
+import uuid
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, Union
+
+import attrs
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from core.cache import caches, anime_detail_cache, anime_totals_cache, api_key_cache, user_principal_cache, \
+    episode_video_cache
+from core.notify import PgListener
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache_invalidation"
+
+# payload NOTIFY maksimal 8000 byte, sisakan ruang untuk envelope
+MAX_PAYLOAD = 7500
+
+Handler = Callable[[Tuple[str, ...]], Union[None, Awaitable[None]]]
+
+
+class InvalidationKind(str, Enum):
+    anime = 'anime'
+    anime_catalog = 'anime_catalog'
+    api_key = 'api_key'
+    user = 'user'
+    site_settings = 'site_settings'
+
+
+@attrs.define(frozen=True)
+class InvalidationEvent:
+    """
+    satu event invalidation; ``keys`` kosong berarti semua entry untuk ``kind`` ini
+    """
+    kind: InvalidationKind
+    keys: Tuple[str, ...] = attrs.field(default=(), converter=lambda keys: tuple(str(key) for key in keys))
+
+
+@attrs.define(slots=False)
+class InvalidationBus:
+    """
+    bus invalidation cache antar worker lewat Postgres ``LISTEN/NOTIFY``
+
+    Writer memanggil ``publish`` di dalam transaksinya. Event langsung diterapkan ke
+    cache worker itu sendiri, lalu dikirim ke semua worker (termasuk dirinya) saat
+    commit, jadi entry yang sempat diisi ulang sebelum commit ikut terbuang. Kalau
+    transaksi rollback, NOTIFY ikut batal.
+
+    Setiap proses punya ``origin`` dan nomor urut sendiri. Kalau nomor dari origin
+    lain loncat (event hilang, misalnya transaksinya rollback) atau koneksi listener
+    putus, semua cache lokal di-flush karena tidak ada cara tahu apa yang terlewat.
+    """
+    origin: str = attrs.field(factory=lambda: uuid.uuid4().hex)
+    published: int = attrs.field(default=0, init=False)
+    received: int = attrs.field(default=0, init=False)
+    gaps: int = attrs.field(default=0, init=False)
+    flushes: int = attrs.field(default=0, init=False)
+    _seq: int = attrs.field(default=0, init=False)
+    _last_seen: Dict[str, int] = attrs.field(factory=dict, init=False)
+    _handlers: Dict[InvalidationKind, List[Handler]] = attrs.field(factory=dict, init=False)
+    _flush_handlers: List[Callable[[], Union[None, Awaitable[None]]]] = attrs.field(factory=list, init=False)
+    listener: PgListener = attrs.field(init=False)
+
+    def __attrs_post_init__(self):
+        self.listener = PgListener(
+            channel=INVALIDATION_CHANNEL,
+            on_notify=self._receive,
+            on_connect=self._reconnected,
+        )
+
+    def subscribe(self, kind: InvalidationKind, handler: Handler) -> None:
+        """
+        daftarkan handler untuk ``kind``; handler menerima tuple key (kosong = semua)
+        """
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def on_flush(self, handler: Callable[[], Union[None, Awaitable[None]]]) -> None:
+        """
+        daftarkan handler yang dipanggil setelah semua cache lokal di-flush
+        """
+        self._flush_handlers.append(handler)
+
+    def start(self) -> None:
+        self.listener.start()
+
+    async def stop(self) -> None:
+        await self.listener.stop()
+
+    async def publish(self, conn: AsyncConnection, *events: InvalidationEvent) -> None:
+        """
+        kirim event invalidation sebagai bagian dari transaksi ``conn``
+
+        :param conn: koneksi milik transaksi yang melakukan write
+        :param events: event yang dikirim
+        """
+        if not events:
+            return
+
+        for event in events:
+            await self._apply(event)
+
+        self._seq += 1
+        payload = self._encode(events)
+        await conn.execute(select(func.pg_notify(INVALIDATION_CHANNEL, payload)))
+        self.published += 1
+
+    def _encode(self, events: Tuple[InvalidationEvent, ...]) -> str:
+        body = [[event.kind.value, list(event.keys)] for event in events]
+        payload = json.dumps({"o": self.origin, "s": self._seq, "e": body}, separators=(",", ":"))
+
+        if len(payload.encode("utf-8")) > MAX_PAYLOAD:
+            # terlalu banyak key, kirim per kind saja
+            kinds = sorted({event.kind.value for event in events})
+            payload = json.dumps({"o": self.origin, "s": self._seq, "e": [[kind, []] for kind in kinds]})
+
+        return payload
+
+    async def _reconnected(self) -> None:
+        # event selama listener putus tidak akan pernah sampai
+        self._last_seen.clear()
+        await self.flush()
+
+    async def _receive(self, payload: str) -> None:
+        self.received += 1
+        try:
+            message = json.loads(payload)
+            origin, seq = message["o"], int(message["s"])
+            events = [InvalidationEvent(InvalidationKind(kind), keys) for kind, keys in message["e"]]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("malformed invalidation payload, flushing: %r", payload[:200])
+            await self.flush()
+            return
+
+        if origin != self.origin:
+            last = self._last_seen.get(origin)
+            self._last_seen[origin] = seq if last is None else max(last, seq)
+            if last is not None and seq > last + 1:
+                self.gaps += 1
+                await self.flush()
+                return
+
+        for event in events:
+            await self._apply(event)
+
+    async def _apply(self, event: InvalidationEvent) -> None:
+        for handler in self._handlers.get(event.kind, []):
+            try:
+                result = handler(event.keys)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("invalidation handler for %s failed", event.kind.value)
+
+    async def flush(self) -> None:
+        """
+        buang semua cache lokal, dipakai saat event mungkin ada yang terlewat
+        """
+        self.flushes += 1
+        for cache in caches.values():
+            cache.clear()
+
+        for handler in self._flush_handlers:
+            try:
+                result = handler()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("invalidation flush handler failed")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "origin": self.origin,
+            "connected": self.listener.connected,
+            "reconnects": self.listener.reconnects,
+            "published": self.published,
+            "received": self.received,
+            "gaps": self.gaps,
+            "flushes": self.flushes,
+        }
+
+
+def _evictor(cache, convert: Callable[[str], Any] = str) -> Handler:
+    def evict(keys: Tuple[str, ...]) -> None:
+        if not keys:
+            cache.clear()
+        for key in keys:
+            cache.invalidate(convert(key))
+
+    return evict
+
+
+def _evict_episode_videos(keys: Tuple[str, ...]) -> None:
+    # key cache video per (anime_id, number), buang semua episode milik anime yang berubah
+    if not keys:
+        episode_video_cache.clear()
+        return
+
+    anime_ids = {int(key) for key in keys}
+    episode_video_cache.invalidate_where(lambda key: key[0] in anime_ids)
+
+
+invalidation_bus = InvalidationBus()
+invalidation_bus.subscribe(InvalidationKind.anime, _evictor(anime_detail_cache, int))
+invalidation_bus.subscribe(InvalidationKind.anime, _evict_episode_videos)
+invalidation_bus.subscribe(InvalidationKind.anime_catalog, lambda keys: anime_totals_cache.clear())
+invalidation_bus.subscribe(InvalidationKind.api_key, lambda keys: api_key_cache.clear())
+invalidation_bus.subscribe(InvalidationKind.user, _evictor(user_principal_cache))
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, Set
+
+import asyncpg
+import attrs
+
+from core.db import engine
+
+logger = logging.getLogger(__name__)
+
+
+def listener_dsn() -> str:
+    """
+    DSN asyncpg dari url engine SQLAlchemy (tanpa ``+asyncpg``)
+    """
+    return engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+@attrs.define(slots=False)
+class PgListener:
+    """
+    satu koneksi asyncpg khusus untuk ``LISTEN`` di channel Postgres
+
+    Koneksi ini di luar pool engine supaya tidak memakan slot request. Kalau koneksi
+    putus, listener connect ulang dengan backoff lalu memanggil ``on_connect``:
+    notifikasi selama putus tidak akan pernah sampai, jadi ``on_connect`` harus
+    menganggap semua cache sudah basi.
+
+    :param channel: nama channel ``LISTEN``
+    :param on_notify: dipanggil dengan payload setiap ada ``NOTIFY``
+    :param on_connect: dipanggil setiap kali koneksi (ulang) berhasil
+    """
+    channel: str
+    on_notify: Callable[[str], Awaitable[None]]
+    on_connect: Optional[Callable[[], Awaitable[None]]] = None
+    max_backoff: float = 30.0
+    ping_interval: float = 30.0
+    connected: bool = attrs.field(default=False, init=False)
+    reconnects: int = attrs.field(default=0, init=False)
+    _task: Optional[asyncio.Task] = attrs.field(default=None, init=False)
+    _handlers: Set[asyncio.Task] = attrs.field(factory=set, init=False)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _dispatch(self, connection, pid: int, channel: str, payload: str) -> None:
+        task = asyncio.create_task(self._handle(payload))
+        self._handlers.add(task)
+        task.add_done_callback(self._handlers.discard)
+
+    async def _handle(self, payload: str) -> None:
+        try:
+            await self.on_notify(payload)
+        except Exception:
+            logger.exception("handler for %s notification failed", self.channel)
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(listener_dsn())
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _: closed.set())
+                await conn.add_listener(self.channel, self._dispatch)
+                self.connected = True
+                backoff = 1.0
+
+                if self.on_connect is not None:
+                    try:
+                        await self.on_connect()
+                    except Exception:
+                        logger.exception("on_connect for %s failed", self.channel)
+
+                # koneksi yang mati diam-diam (tanpa FIN) hanya ketahuan dari ping
+                while not closed.is_set():
+                    try:
+                        await asyncio.wait_for(closed.wait(), timeout=self.ping_interval)
+                    except asyncio.TimeoutError:
+                        await conn.fetchval("SELECT 1", timeout=self.ping_interval)
+                logger.warning("listener for %s lost its connection", self.channel)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("listener for %s failed, reconnecting in %.0fs", self.channel, backoff)
+            finally:
+                self.connected = False
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
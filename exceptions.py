@@ -60,4 +60,51 @@ class UserPasswordError(Exception):
     Represents an exception that is raised when a user password is incorrect.
     """
 
+class InvalidCursorError(Exception):
+    """
+    Represents an exception that is raised when a pagination cursor cannot be decoded.
+
+    Cursors are opaque tokens handed out by listing endpoints; this is raised when a
+    client sends one that was tampered with or belongs to a different listing.
+    """
+
+class AnimeNotFoundError(Exception):
+    """
+    Represents an exception that is raised when the requested anime does not exist.
+    """
+
+
+class EpisodeNotFoundError(Exception):
+    """
+    Represents an exception that is raised when the requested episode does not exist.
+    """
+
+
+class EpisodeVideoUnavailableError(Exception):
+    """
+    Represents an exception that is raised when an episode's video URL cannot be resolved.
+
+    Either the episode has no stored page url, the source page could not be fetched, or
+    the page has no video iframe.
+    """
+
+
+class IngestQueueFullError(Exception):
+    """
+    Represents an exception that is raised when the ingestion queue cannot accept more submissions.
 
+    :ivar retry_after: Estimated seconds until the queue has room again.
+    :type retry_after: int
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+class PasswordHasherBusyError(Exception):
+    """
+    Represents an exception that is raised when the password hashing pool is saturated.
+
+    Callers should answer 503 so clients back off instead of piling more bcrypt work
+    onto a worker that is already behind.
+    """
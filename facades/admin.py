@@ -5,9 +5,9 @@ from sqlalchemy.ext.asyncio import AsyncConnection
 from api.config import cfg
 from exceptions import AdminPasswordError
 from helpers.authentication import PasswordHasher
-from helpers.token_maker import TokenMaker
+from helpers.token_maker import token_maker
 from schemas.admin import AddCrawlerSettingsSchema, AdminLoginSchema, AdminMeResponseSchema, CrawlerSettingsResponseSchema, SettingsSiteSchema, AddCrawlersSchema, AnimeBase, \
-    FilterAnime
+    FilterAnime, SearchAnime, IngestResultSchema, KnownEpisodesSchema
 from services.admin import AdminCRUD
 
 
@@ -20,9 +20,7 @@ class Admin:
     async def login(self, data: AdminLoginSchema, hasher: PasswordHasher) -> str:
         try:
             check_login = await AdminCRUD(self.conn).login(data, hasher)
-            token = TokenMaker()
-
-            return token.return_token(
+            return token_maker.return_token(
                 cfg.password.token_key, check_login
             )
         except AdminPasswordError as e:
@@ -69,12 +67,27 @@ class Admin:
     async def add_or_update_anime(self, api_key: str, data: AnimeBase) -> bool:
         return await AdminCRUD(self.conn).add_or_update_anime(api_key, data)
 
+    async def authorize_crawler(self, api_key: str) -> None:
+        return await AdminCRUD(self.conn).authorize_crawler(api_key)
+
+    async def ingest_anime(self, data: AnimeBase) -> IngestResultSchema:
+        return await AdminCRUD(self.conn).ingest_anime(data)
+
+    async def ingest_batch(self, items: List[AnimeBase]) -> List[IngestResultSchema]:
+        return await AdminCRUD(self.conn).ingest_batch(items)
+
     async def listing_anime(self, data: FilterAnime):
         return await AdminCRUD(self.conn).listing_anime(data)
 
+    async def search_anime(self, data: SearchAnime):
+        return await AdminCRUD(self.conn).search_anime(data)
+
     async def detail_anime(self, anime_id: int ):
         return await AdminCRUD(self.conn).detail_anime(anime_id)
     
+    async def known_episodes(self, title: str) -> KnownEpisodesSchema:
+        return await AdminCRUD(self.conn).known_episodes(title)
+
     async def add_crawler_settings(self, data: AddCrawlerSettingsSchema) -> bool:
         return await AdminCRUD(self.conn).add_crawler_settings(data)
     
@@ -1,12 +1,14 @@
-from typing import List
+from typing import List, Optional
 import attrs
 from sqlalchemy.ext.asyncio import AsyncConnection
 
 from api.config import cfg
 from exceptions import UserAlreadyExistsError, UserNotFoundError, UserPasswordError
 from helpers.authentication import BasicSalt, PasswordHasher
-from helpers.token_maker import TokenMaker
-from schemas.users import BookmarkResponseSchema, AddBookmarkSchema, UserLoginSchema, UserRegisterSchema, UserProfileSchema, UserUpdateProfileSchema, UserChangePasswordSchema
+from helpers.token_maker import token_maker
+from schemas.users import BookmarkResponseSchema, AddBookmarkSchema, UserLoginSchema, UserRegisterSchema, UserProfileSchema, UserUpdateProfileSchema, UserChangePasswordSchema, \
+    UserPrincipalSchema, BookmarkBulkAddResponseSchema, BookmarkBulkRemoveResponseSchema, \
+    BookmarkListingResponse, FilterBookmarks
 from services.users import UserService
 
 
@@ -21,9 +23,7 @@ class User:
     async def login(self, user: UserLoginSchema) -> str:
         try:
             check_login = await UserService(self.conn).login(user)
-            token = TokenMaker()
-
-            return token.return_token(
+            return token_maker.return_token(
                 cfg.password.token_key, check_login
             )
         except UserPasswordError as e:
@@ -32,6 +32,9 @@ class User:
     async def get_user_by_uuid(self, uuid: str) -> int:
         return await UserService(self.conn).get_user_by_uuid(uuid)
     
+    async def get_principal(self, uuid: str) -> Optional[UserPrincipalSchema]:
+        return await UserService(self.conn).get_principal(uuid)
+
     async def get_user_by_email(self, email: str):
         """Get user by email"""
         return await UserService(self.conn).get_user_by_email(email)
@@ -68,13 +71,23 @@ class User:
             bookmark_data.content_id
         )
     
+    async def add_bookmarks(self, user_id: int, bookmarks: List[AddBookmarkSchema]) -> BookmarkBulkAddResponseSchema:
+        return await UserService(self.conn).add_bookmarks(user_id, bookmarks)
+
     async def remove_bookmark(self, user_id: int, content_id: int) -> bool:
         return await UserService(self.conn).remove_bookmark(user_id, content_id)
+
+    async def remove_bookmarks(self, user_id: int, content_ids: List[int]) -> BookmarkBulkRemoveResponseSchema:
+        return await UserService(self.conn).remove_bookmarks(user_id, content_ids)
     
     async def get_bookmarks(self, user_id: int) -> List[BookmarkResponseSchema]:
         return await UserService(self.conn).get_bookmarks(user_id)
     
+    async def listing_bookmarks(self, user_id: int, data: FilterBookmarks) -> BookmarkListingResponse:
+        return await UserService(self.conn).listing_bookmarks(user_id, data)
+
     async def check_bookmark_exists(self, user_id: int, content_id: int) -> bool:
         return await UserService(self.conn).check_bookmark_exists(user_id, content_id)
 
-        
+    async def bookmarked_content_ids(self, user_id: int, content_ids: List[int]) -> List[int]:
+        return await UserService(self.conn).bookmarked_content_ids(user_id, content_ids)
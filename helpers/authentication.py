@@ -1,3 +1,9 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
 import attrs
 
 from abc import ABCMeta
@@ -5,6 +11,8 @@ from abc import abstractmethod
 
 from passlib.context import CryptContext
 
+from exceptions import PasswordHasherBusyError
+
 
 
 
@@ -41,6 +49,76 @@ class BasicSalt(SaltAbc):
         return f"{self.salt}/{password}\\{self.salt}"
 
 
+@attrs.define(slots=False)
+class HashingPool:
+    """
+    thread pool terbatas untuk bcrypt supaya hashing tidak memblok event loop
+
+    bcrypt melepas GIL selama hashing, jadi thread cukup. Kalau jumlah job yang
+    menunggu + jalan sudah ``max_pending``, job baru langsung ditolak dengan
+    ``PasswordHasherBusyError`` daripada ikut antri di tengah login storm.
+    """
+    max_workers: int
+    max_pending: int
+    pending: int = attrs.field(default=0, init=False)
+    completed: int = attrs.field(default=0, init=False)
+    rejected: int = attrs.field(default=0, init=False)
+    _wait_ms_total: float = attrs.field(default=0.0, init=False)
+    _run_ms_total: float = attrs.field(default=0.0, init=False)
+    _max_run_ms: float = attrs.field(default=0.0, init=False)
+    _executor: ThreadPoolExecutor = attrs.field(init=False)
+
+    def __attrs_post_init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        jalankan ``fn(*args)`` di pool
+
+        :raise PasswordHasherBusyError: kalau antrian pool penuh
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusyError
+
+        self.pending += 1
+        submitted = time.perf_counter()
+        started = submitted
+
+        def job():
+            nonlocal started
+            started = time.perf_counter()
+            return fn(*args)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            finished = time.perf_counter()
+            self.pending -= 1
+            self.completed += 1
+            self._wait_ms_total += (started - submitted) * 1000
+            self._run_ms_total += (finished - started) * 1000
+            self._max_run_ms = max(self._max_run_ms, (finished - started) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        counter dan latency pool untuk monitoring
+        """
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self._wait_ms_total / self.completed, 2) if self.completed else 0.0,
+            "avg_run_ms": round(self._run_ms_total / self.completed, 2) if self.completed else 0.0,
+            "max_run_ms": round(self._max_run_ms, 2),
+        }
+
+
+hashing_pool = HashingPool(max_workers=min(4, os.cpu_count() or 1), max_pending=64)
+
+
 @attrs.define(slots=False)
 class PasswordHasher:
     """
@@ -71,4 +149,20 @@ class PasswordHasher:
         """
         salted = self.salt_method(plain_password)
 
-        return self.context.verify(salted, hashed_password)
\ No newline at end of file
+        return self.context.verify(salted, hashed_password)
+
+    async def hash_async(self, password: str) -> str:
+        """
+        ``hash`` yang dijalankan di ``hashing_pool``, pakai ini di dalam handler async
+
+        :raise PasswordHasherBusyError: kalau pool sedang penuh
+        """
+        return await hashing_pool.run(self.hash, password)
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        ``verify`` yang dijalankan di ``hashing_pool``, pakai ini di dalam handler async
+
+        :raise PasswordHasherBusyError: kalau pool sedang penuh
+        """
+        return await hashing_pool.run(self.verify, plain_password, hashed_password)
@@ -0,0 +1,98 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import attrs
+
+
+@attrs.define(slots=False)
+class TTLCache:
+    """
+    cache in-process dengan batas ukuran (LRU) dan umur entry (TTL)
+
+    Dipakai untuk data yang sering dibaca tapi jarang berubah. Cache ini per-proses,
+    jadi setiap worker uvicorn punya isinya sendiri.
+    """
+    maxsize: int
+    ttl: float
+    hits: int = attrs.field(default=0, init=False)
+    misses: int = attrs.field(default=0, init=False)
+    evictions: int = attrs.field(default=0, init=False)
+    _entries: "OrderedDict[Hashable, Tuple[float, Any]]" = attrs.field(factory=OrderedDict, init=False)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        ambil value dari cache, ``default`` kalau tidak ada atau sudah expired
+
+        :param key: key cache
+        :param default: value kalau cache miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        simpan value ke cache
+
+        :param key: key cache
+        :param value: value yang disimpan
+        :param ttl: umur entry dalam detik, default ``self.ttl``
+        """
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        hapus satu entry dari cache
+        """
+        self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        hapus semua entry yang key-nya cocok dengan ``predicate``, kembalikan jumlahnya
+
+        :param predicate: dipanggil per key, ``True`` berarti entry dihapus
+        """
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            del self._entries[key]
+
+        return len(keys)
+
+    def clear(self) -> None:
+        """
+        hapus semua entry dari cache
+        """
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        counter cache untuk monitoring dan sizing
+        """
+        lookups = self.hits + self.misses
+
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
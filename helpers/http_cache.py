@@ -0,0 +1,68 @@
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    membuat weak ETag dari versi resource (misalnya ``updated_at``)
+
+    :param parts: nilai yang menentukan isi response
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+    return f'W/"{digest[:32]}"'
+
+
+def cache_headers(etag: str, last_modified: Optional[int], max_age: int) -> Dict[str, str]:
+    """
+    header ``ETag``, ``Last-Modified`` dan ``Cache-Control`` untuk response GET
+
+    :param etag: hasil ``make_etag``
+    :param last_modified: epoch detik terakhir resource berubah
+    :param max_age: detik response boleh dipakai tanpa revalidasi
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}",
+    }
+    if last_modified:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[int]) -> bool:
+    """
+    cek conditional GET; ``If-None-Match`` diprioritaskan dari ``If-Modified-Since``
+
+    :param request: request yang masuk
+    :param etag: ETag versi resource sekarang
+    :param last_modified: epoch detik terakhir resource berubah
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # weak comparison: W/ prefix diabaikan
+        current = etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == current for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return last_modified <= since
+
+    return False
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    """
+    response 304 tanpa body, dengan header cache yang sama
+    """
+    return Response(status_code=304, headers=headers)
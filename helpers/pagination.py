@@ -0,0 +1,36 @@
+import base64
+import json
+from typing import Any, List
+
+from exceptions import InvalidCursorError
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    membuat cursor opaque dari sort key row terakhir
+
+    :param values: nilai sort key sesuai urutan ``ORDER BY``
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    membaca kembali cursor yang dibuat ``encode_cursor``
+
+    :param cursor: cursor dari response sebelumnya
+    :param size: jumlah nilai sort key yang diharapkan
+    :raises InvalidCursorError: kalau cursor rusak atau bukan buatan server
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursorError from e
+
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError
+
+    return values
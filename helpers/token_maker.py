@@ -1,7 +1,11 @@
+import hashlib
+import time
 from typing import Dict, Any
 from jose import JWTError, jwt
 from fastapi import HTTPException
 
+from core.cache import token_claims_cache
+
 
 class TokenMaker:
     def create_token(self, key: str, name: str) -> str:
@@ -15,12 +19,29 @@ class TokenMaker:
     def verify_token(self, token: str, key: str) -> dict:
         """
         memverify token
+
+        Hasil decode di-cache per token, jadi request berikutnya dengan bearer token
+        yang sama tidak perlu verifikasi HMAC lagi.
         """
+        cache_key = hashlib.sha256(f"{key}\0{token}".encode("utf-8")).hexdigest()
+        claims = token_claims_cache.get(cache_key)
+        if claims is not None:
+            return dict(claims)
+
         try:
-            return jwt.decode(token, key, algorithms=["HS256"])
+            claims = jwt.decode(token, key, algorithms=["HS256"])
         except JWTError as e:
             raise HTTPException(401, {"msg": str(e)}) from e
 
+        # token dengan exp tidak boleh lolos dari cache setelah expired
+        ttl = None
+        if "exp" in claims:
+            ttl = min(token_claims_cache.ttl, float(claims["exp"]) - time.time())
+        if ttl is None or ttl > 0:
+            token_claims_cache.set(cache_key, claims, ttl=ttl)
+
+        return dict(claims)
+
     def return_token(self, key: str, name: str) -> dict:
         """
         return token
@@ -28,4 +49,7 @@ class TokenMaker:
         return {
             "access_token": self.create_token(key, name),
             "type": "bearer",
-        }
\ No newline at end of file
+        }
+
+
+token_maker = TokenMaker()
@@ -0,0 +1,63 @@
+import codecs
+import urllib.request
+from html.parser import HTMLParser
+from typing import Optional
+from urllib.parse import urlsplit
+
+# sama dengan User-Agent crawler, beberapa situs sumber menolak UA default urllib
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+# halaman episode jarang lebih dari beberapa ratus KB, batasi supaya tidak membaca file besar
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+
+
+class _IframeParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.src: Optional[str] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "iframe" and self.src is None:
+            src = dict(attrs).get("src")
+            if src:
+                self.src = src.strip()
+
+
+def extract_iframe_src(html: str) -> Optional[str]:
+    """
+    ``src`` iframe pertama di halaman
+
+    Satu-satunya routine ekstraksi video url: dipakai resolver API dan juga
+    ``scrape_episode_details`` di scripts/, jadi hasil keduanya selalu sama. Hanya
+    stdlib, karena image backend tidak meng-install BeautifulSoup.
+
+    :param html: isi halaman episode
+    """
+    parser = _IframeParser()
+    parser.feed(html)
+    parser.close()
+
+    return parser.src
+
+
+def fetch_page(url: str, timeout: float) -> str:
+    """
+    GET halaman episode dengan urllib (blocking, jalankan lewat ``asyncio.to_thread``)
+
+    :param url: url halaman episode yang disimpan crawler
+    :param timeout: detik
+    :raise OSError: kalau request gagal atau status bukan 2xx
+    :raise ValueError: kalau url bukan http(s), supaya ``file://`` dan sejenisnya tidak dibuka
+    """
+    if urlsplit(url).scheme not in ("http", "https"):
+        raise ValueError(f"unsupported episode url: {url!r}")
+
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        charset = response.headers.get_content_charset() or "utf-8"
+        try:
+            codecs.lookup(charset)
+        except LookupError:
+            # charset ngawur di header Content-Type, anggap utf-8
+            charset = "utf-8"
+        return response.read(MAX_PAGE_BYTES).decode(charset, errors="replace")
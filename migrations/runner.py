@@ -0,0 +1,103 @@
+import argparse
+import asyncio
+import time
+from typing import Set
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from core.db import engine
+from migrations.versions import MIGRATIONS, ConcurrentIndex, Migration
+
+# key pg_advisory_lock supaya dua init-db tidak migrasi bersamaan
+LOCK_KEY = 724_113_001
+
+
+async def _applied_versions(conn: AsyncConnection) -> Set[int]:
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version BIGINT PRIMARY KEY, "
+        "name VARCHAR(255) NOT NULL, "
+        "applied_at BIGINT NOT NULL)"
+    ))
+
+    return set((await conn.execute(text("SELECT version FROM schema_migrations"))).scalars())
+
+
+async def _record(conn: AsyncConnection, migration: Migration) -> None:
+    await conn.execute(
+        text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+        {"version": migration.version, "name": migration.name, "applied_at": int(time.time())}
+    )
+
+
+async def _create_index_concurrently(conn: AsyncConnection, index: ConcurrentIndex) -> None:
+    # build CONCURRENTLY yang gagal meninggalkan index INVALID, dan IF NOT EXISTS
+    # akan melewatinya, jadi index invalid di-drop dulu sebelum dibuat ulang
+    invalid = (await conn.execute(text(
+        "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": index.name})).first()
+
+    if invalid:
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+
+    unique = "UNIQUE " if index.unique else ""
+    await conn.execute(text(
+        f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {index.name} {index.definition}"
+    ))
+
+
+async def _apply(migration: Migration) -> None:
+    if migration.indexes or migration.drop_indexes:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for index in migration.indexes:
+                await _create_index_concurrently(conn, index)
+            for name in migration.drop_indexes:
+                await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            await _record(conn, migration)
+        return
+
+    async with engine.begin() as conn:
+        if migration.run is not None:
+            await migration.run(conn)
+        for statement in migration.statements:
+            await conn.execute(text(statement))
+        await _record(conn, migration)
+
+
+async def main(status_only: bool = False):
+
+    async with engine.connect() as lock_conn:
+        lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+        await lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": LOCK_KEY})
+
+        try:
+            applied = await _applied_versions(lock_conn)
+            pending = [m for m in sorted(MIGRATIONS, key=lambda m: m.version) if m.version not in applied]
+
+            if status_only:
+                for migration in MIGRATIONS:
+                    state = "applied" if migration.version in applied else "pending"
+                    print(f"{migration.version:04d} {migration.name}: {state}")
+                return
+
+            if not pending:
+                print("Schema is up to date, nothing to migrate")
+
+            for migration in pending:
+                print(f"Applying {migration.version:04d} {migration.name}...")
+                await _apply(migration)
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LOCK_KEY})
+
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument("--status", action="store_true", help="only list applied and pending migrations")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.status))
@@ -0,0 +1,174 @@
+from typing import Awaitable, Callable, Optional, Tuple
+
+import attrs
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from core.db import meta
+from models.admin import AdminModel
+from models.animes import AnimesModel, SEARCH_VECTOR_SQL
+from models.bookmarks import BookmarksModel
+from models.catalog import CatalogRevisionModel
+from models.crawler import CrawlersModel
+from models.crawler_settings import CrawelerSetting
+from models.episodes import EpisodesModel
+from models.settings import SiteSettingsModel
+from models.users import UserModel
+
+
+@attrs.define(frozen=True)
+class ConcurrentIndex:
+    """
+    index yang dibuat dengan ``CREATE INDEX CONCURRENTLY``
+
+    :param name: nama index, harus sama dengan ``Index`` di models
+    :param definition: bagian setelah nama index, contoh ``ON animes (title)``
+    :param unique: ``CREATE UNIQUE INDEX``
+    """
+    name: str
+    definition: str
+    unique: bool = False
+
+
+@attrs.define(frozen=True)
+class Migration:
+    """
+    satu langkah migrasi schema
+
+    Langkah biasa (``statements``/``run``) dijalankan dalam satu transaction bersama
+    pencatatan versinya. Langkah dengan ``indexes``/``drop_indexes`` dijalankan di luar
+    transaction karena ``CREATE/DROP INDEX CONCURRENTLY`` tidak boleh di dalam
+    transaction block.
+
+    Semua langkah harus idempotent (``IF NOT EXISTS``): database baru dibuat oleh
+    langkah pertama dari models terbaru, jadi langkah berikutnya bisa menemukan
+    object yang sudah ada.
+    """
+    version: int
+    name: str
+    statements: Tuple[str, ...] = ()
+    run: Optional[Callable[[AsyncConnection], Awaitable[None]]] = None
+    indexes: Tuple[ConcurrentIndex, ...] = ()
+    drop_indexes: Tuple[str, ...] = ()
+
+
+async def _create_tables(conn: AsyncConnection) -> None:
+    # extension untuk index trigram di animes.title
+    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+    await conn.run_sync(meta.create_all, checkfirst=True, tables=[
+        UserModel,
+        AdminModel,
+        CrawlersModel,
+        AnimesModel,
+        SiteSettingsModel,
+        CrawelerSetting,
+        BookmarksModel
+    ])
+
+
+# pindahkan array JSONB animes.episodes lama ke tabel episodes; kolom lama dibiarkan.
+# Crawler otakudesu lama mengirim "indo" sebagai nomor (potongan terakhir url
+# ``...-episode-12-sub-indo/``), jadi nomor tanpa angka diambil ulang dari url-nya.
+EPISODE_BACKFILL_SQL = (
+    "INSERT INTO episodes (anime_id, number, sort_order, title, url, video_url, date, created_at, updated_at) "
+    "SELECT a.id, left(n.number, 50), "
+    "coalesce(substring(n.number from '\\d+(?:\\.\\d+)?')::float8, 0), "
+    "left(e->>'title', 255), left(e->>'url', 500), e->>'video_url', left(e->>'date', 100), "
+    "a.updated_at, a.updated_at "
+    "FROM animes a CROSS JOIN LATERAL jsonb_array_elements("
+    "CASE WHEN jsonb_typeof(a.episodes) = 'array' THEN a.episodes ELSE '[]'::jsonb END) AS e "
+    "CROSS JOIN LATERAL (SELECT CASE WHEN e->>'number' !~ '\\d' AND e->>'url' ~ 'episode-\\d' "
+    "THEN substring(e->>'url' from 'episode-(\\d+(?:\\.\\d+)?)') ELSE e->>'number' END AS number) AS n "
+    "WHERE coalesce(n.number, '') <> '' "
+    "ON CONFLICT (anime_id, number) DO NOTHING"
+)
+
+
+async def _create_episodes(conn: AsyncConnection) -> None:
+    await conn.run_sync(meta.create_all, checkfirst=True, tables=[EpisodesModel])
+
+    await conn.execute(text(EPISODE_BACKFILL_SQL))
+
+
+async def _create_catalog_revision(conn: AsyncConnection) -> None:
+    await conn.run_sync(meta.create_all, checkfirst=True, tables=[CatalogRevisionModel])
+
+    await conn.execute(text("INSERT INTO catalog_revision (id, revision) VALUES (1, 0) ON CONFLICT (id) DO NOTHING"))
+
+
+MIGRATIONS: Tuple[Migration, ...] = (
+    Migration(1, "create tables", run=_create_tables),
+    Migration(2, "animes search vector", statements=(
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "ALTER TABLE animes ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED",
+    )),
+    Migration(3, "animes search indexes", indexes=(
+        ConcurrentIndex("ix_animes_search_vector", "ON animes USING gin (search_vector)"),
+        ConcurrentIndex("ix_animes_title_trgm", "ON animes USING gin (title gin_trgm_ops)"),
+    )),
+    Migration(4, "animes listing and genre indexes", indexes=(
+        ConcurrentIndex(
+            "ix_animes_listing_order",
+            "ON animes (coalesce(released_year, '0000') DESC, id DESC)"
+        ),
+        ConcurrentIndex("ix_animes_genres", "ON animes USING gin (genres jsonb_path_ops)"),
+    )),
+    Migration(5, "title, updated_at and bookmark indexes", indexes=(
+        ConcurrentIndex("ix_animes_title", "ON animes (title)"),
+        ConcurrentIndex("ix_animes_updated_at", "ON animes (updated_at)"),
+        ConcurrentIndex("ix_bookmarks_user_content", "ON bookmarks (user_id, content_id)"),
+    )),
+    Migration(6, "episodes table", run=_create_episodes),
+    Migration(7, "animes content hash", statements=(
+        "ALTER TABLE animes ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    )),
+    # title jadi key upsert; duplikat lama digabung ke id terkecil sebelum index unique dibuat.
+    # Episode dan bookmark duplikat dipindah ke id yang dipertahankan dulu, kalau tidak
+    # ikut terhapus lewat ON DELETE CASCADE; yang bentrok dengan milik id tersebut dibuang.
+    Migration(8, "merge duplicate anime titles", statements=(
+        "CREATE TEMP TABLE anime_duplicates ON COMMIT DROP AS "
+        "SELECT id, min(id) OVER (PARTITION BY title) AS keep_id FROM animes",
+        "DELETE FROM anime_duplicates WHERE id = keep_id",
+        "INSERT INTO episodes (anime_id, number, sort_order, title, url, video_url, date, created_at, updated_at) "
+        "SELECT d.keep_id, e.number, e.sort_order, e.title, e.url, e.video_url, e.date, e.created_at, e.updated_at "
+        "FROM episodes e JOIN anime_duplicates d ON e.anime_id = d.id "
+        "ORDER BY e.anime_id "
+        "ON CONFLICT (anime_id, number) DO NOTHING",
+        "DELETE FROM bookmarks b USING anime_duplicates d "
+        "WHERE b.content_id = d.id AND EXISTS ("
+        "SELECT 1 FROM bookmarks k WHERE k.user_id = b.user_id AND k.content_id = d.keep_id)",
+        "DELETE FROM bookmarks b USING anime_duplicates d, bookmarks o, anime_duplicates od "
+        "WHERE b.content_id = d.id AND o.content_id = od.id AND od.keep_id = d.keep_id "
+        "AND o.user_id = b.user_id AND o.id < b.id",
+        "UPDATE bookmarks b SET content_id = d.keep_id FROM anime_duplicates d WHERE b.content_id = d.id",
+        "UPDATE animes SET updated_at = extract(epoch FROM now())::bigint "
+        "WHERE id IN (SELECT keep_id FROM anime_duplicates)",
+        "DELETE FROM animes a USING anime_duplicates d WHERE a.id = d.id",
+    )),
+    Migration(9, "unique anime title", indexes=(
+        ConcurrentIndex("uq_animes_title", "ON animes (title)", unique=True),
+    ), drop_indexes=("ix_animes_title",)),
+    # satu bookmark per (user, anime); duplikat dari race check-then-insert lama dibuang
+    Migration(10, "dedupe bookmarks", statements=(
+        "DELETE FROM bookmarks a USING bookmarks b "
+        "WHERE a.user_id = b.user_id AND a.content_id = b.content_id AND a.id > b.id",
+    )),
+    Migration(11, "unique bookmark per user and anime", indexes=(
+        ConcurrentIndex("uq_bookmarks_user_content", "ON bookmarks (user_id, content_id)", unique=True),
+    ), drop_indexes=("ix_bookmarks_user_content",)),
+    Migration(12, "bookmarks listing index", indexes=(
+        ConcurrentIndex("ix_bookmarks_user_created", "ON bookmarks (user_id, created_at DESC, id DESC)"),
+    )),
+    # database yang sudah menjalankan langkah 6 versi lama punya satu row "indo" per anime
+    # otakudesu; isi ulang dengan nomor dari url lalu buang row tersebut
+    Migration(13, "re-derive otakudesu episode numbers", statements=(
+        EPISODE_BACKFILL_SQL,
+        "WITH junk AS ("
+        "DELETE FROM episodes WHERE number !~ '\\d' AND url ~ 'episode-\\d' RETURNING anime_id"
+        ") UPDATE animes SET updated_at = extract(epoch FROM now())::bigint "
+        "WHERE id IN (SELECT anime_id FROM junk)",
+    )),
+    Migration(14, "catalog revision counter", run=_create_catalog_revision),
+)
@@ -1,10 +1,18 @@
-from sqlalchemy import Table, Column, BigInteger, Unicode, String, Text, Date
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Table, Column, BigInteger, Unicode, String, Text, Date, Index, Computed, func, literal_column
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
 from datetime import datetime
 import uuid
 
 from core.db import meta
 
+# dokumen full-text search: title paling berbobot, lalu studio/genre, lalu sinopsis
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(studio, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(genres::text, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(sinopsis, '')), 'C')"
+)
+
 AnimesModel = Table(
     'animes', meta,
     Column('id', BigInteger, primary_key=True, autoincrement=True),
@@ -26,4 +34,40 @@ AnimesModel = Table(
     Column('genres', JSONB, nullable=True),
     Column('created_at', BigInteger, default=lambda: int(datetime.utcnow().timestamp())),
     Column('updated_at', BigInteger, default=lambda: int(datetime.utcnow().timestamp())),
+    Column('content_hash', String(64), nullable=True),  # sha256 metadata terakhir dari crawler
+    Column('search_vector', TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)),
+)
+
+Index('uq_animes_title', AnimesModel.c.title, unique=True)
+Index('ix_animes_updated_at', AnimesModel.c.updated_at)
+
+# sort key listing anime, literal di-inline supaya expression sama persis dengan index
+listing_year = func.coalesce(AnimesModel.c.released_year, literal_column("'0000'"))
+
+Index(
+    'ix_animes_listing_order',
+    listing_year.desc(),
+    AnimesModel.c.id.desc(),
+)
+
+Index(
+    'ix_animes_search_vector',
+    AnimesModel.c.search_vector,
+    postgresql_using='gin',
+)
+
+# trigram index supaya ``title ILIKE '%term%'`` di listing tidak full scan
+Index(
+    'ix_animes_title_trgm',
+    AnimesModel.c.title,
+    postgresql_using='gin',
+    postgresql_ops={'title': 'gin_trgm_ops'},
+)
+
+# jsonb_path_ops lebih kecil dan cepat dari jsonb_ops, tapi hanya untuk ``@>``
+Index(
+    'ix_animes_genres',
+    AnimesModel.c.genres,
+    postgresql_using='gin',
+    postgresql_ops={'genres': 'jsonb_path_ops'},
 )
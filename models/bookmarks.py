@@ -1,6 +1,6 @@
 
 import time
-from sqlalchemy import Table, Column, BigInteger, Unicode, DateTime, ForeignKey, Text, Boolean, UUID, String
+from sqlalchemy import Table, Column, BigInteger, Unicode, DateTime, ForeignKey, Text, Boolean, UUID, String, Index
 
 from core.db import meta
 
@@ -12,4 +12,10 @@ BookmarksModel = Table(
     Column('content_id', BigInteger, ForeignKey('animes.id'), nullable=False),
     Column('created_at', BigInteger, nullable=False, default=int(time.time())), #epoch time
     
-)
\ No newline at end of file
+)
+
+Index('uq_bookmarks_user_content', BookmarksModel.c.user_id, BookmarksModel.c.content_id, unique=True)
+Index(
+    'ix_bookmarks_user_created',
+    BookmarksModel.c.user_id, BookmarksModel.c.created_at.desc(), BookmarksModel.c.id.desc()
+)
@@ -0,0 +1,10 @@
+from sqlalchemy import Table, Column, BigInteger, SmallInteger
+
+from core.db import meta
+
+# satu row (id = 1); ``revision`` naik di transaksi ingest setiap kali katalog berubah
+CatalogRevisionModel = Table(
+    'catalog_revision', meta,
+    Column('id', SmallInteger, primary_key=True, autoincrement=False),
+    Column('revision', BigInteger, nullable=False, server_default='0'),
+)
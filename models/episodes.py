@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import Table, Column, BigInteger, Unicode, Text, Float, ForeignKey, UniqueConstraint, Index
+
+from core.db import meta
+
+EpisodesModel = Table(
+    'episodes', meta,
+    Column('id', BigInteger, primary_key=True, autoincrement=True),
+    Column('anime_id', BigInteger, ForeignKey('animes.id', ondelete='CASCADE'), nullable=False),
+    Column('number', Unicode(50), nullable=False),
+    Column('sort_order', Float, nullable=False, default=0),  # angka dari ``number`` untuk urutan
+    Column('title', Unicode(255), nullable=True),
+    Column('url', Unicode(500), nullable=True),
+    Column('video_url', Text, nullable=True),
+    Column('date', Unicode(100), nullable=True),  # tanggal rilis apa adanya dari sumber
+    Column('created_at', BigInteger, default=lambda: int(datetime.utcnow().timestamp())),
+    Column('updated_at', BigInteger, default=lambda: int(datetime.utcnow().timestamp())),
+    UniqueConstraint('anime_id', 'number', name='uq_episodes_anime_number'),
+)
+
+Index('ix_episodes_anime_order', EpisodesModel.c.anime_id, EpisodesModel.c.sort_order, EpisodesModel.c.number)
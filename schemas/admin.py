@@ -1,7 +1,7 @@
 from datetime import date
 from typing import Optional, Union, List
 from enum import Enum
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import attrs
 
 class AdminLoginSchema(BaseModel):
@@ -75,6 +75,35 @@ class AnimeBase(BaseModel):
     genres: Optional[List[str]] = None
 
 
+class IngestStatusEnum(str, Enum):
+    created = 'created'
+    updated = 'updated'
+    unchanged = 'unchanged'
+    invalid = 'invalid'
+
+
+@attrs.define(slots=False)
+class IngestResultSchema:
+    title: str
+    status: IngestStatusEnum
+    anime_id: Optional[int] = None
+    episodes_written: int = 0
+
+
+@attrs.define(slots=False)
+class IngestQueuedSchema:
+    title: str
+    coalesced: bool
+    depth: int
+
+
+@attrs.define(slots=False)
+class KnownEpisodesSchema:
+    title: str
+    anime_id: Optional[int] = None
+    numbers: List[str] = attrs.field(factory=list)
+
+
 class TypeEnum(str, Enum):
     TV = 'TV'
     Movie = 'Movie'
@@ -85,15 +114,36 @@ class StatusEnum(str, Enum):
     Ongoing = 'Ongoing'
     Completed = 'Completed'
 
+class GenreModeEnum(str, Enum):
+    all = 'all'
+    any = 'any'
+
 class FilterAnime(BaseModel):
     page: Optional[int] = 1
     per_page: Optional[int] = 5
     status: Optional[StatusEnum] = None
     search: Optional[str] = None
     genre: Optional[str] = None
+    genres: Optional[str] = None
+    genre_mode: GenreModeEnum = GenreModeEnum.all
     type: Optional[TypeEnum] = None
+    cursor: Optional[str] = None
 
+    def genre_list(self) -> List[str]:
+        """
+        gabungan ``genre`` dan ``genres`` (dipisah koma), tanpa duplikat
+        """
+        names = [self.genre] if self.genre else []
+        if self.genres:
+            names.extend(name.strip() for name in self.genres.split(','))
 
+        return sorted({name for name in names if name})
+
+
+class SearchAnime(BaseModel):
+    q: str
+    page: Optional[int] = 1
+    per_page: Optional[int] = 10
 
 
 @attrs.define(slots=False)
@@ -104,6 +154,7 @@ class ListingAnimeBase:
     banner: Optional[str] = None
     genres: Optional[List[str]] = None
     released_year: Optional[str] = None
+    is_bookmarked: Optional[bool] = None
 
 @attrs.define(slots=False)
 class GeneralListingResponse:
@@ -111,6 +162,45 @@ class GeneralListingResponse:
     per_page: int
     total: int
     data: List[ListingAnimeBase]
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+
+
+@attrs.define(slots=False)
+class SearchAnimeResponse:
+    q: str
+    page: int
+    per_page: int
+    data: List[ListingAnimeBase]
+
+
+@attrs.define(slots=False)
+class EpisodeResponseSchema:
+    number: str
+    title: Optional[str] = None
+    url: Optional[str] = None
+    video_url: Optional[str] = None
+    date: Optional[str] = None
+
+
+@attrs.define(slots=False)
+class EpisodeVideoSchema:
+    anime_id: int
+    number: str
+    video_url: str
+
+
+class FilterEpisodes(BaseModel):
+    per_page: int = Field(50, ge=1, le=200)
+    cursor: Optional[str] = None
+
+
+@attrs.define(slots=False)
+class EpisodeListingResponse:
+    anime_id: int
+    per_page: int
+    data: List[EpisodeResponseSchema]
+    next_cursor: Optional[str] = None
 
 
 @attrs.define(slots=False)
@@ -126,8 +216,10 @@ class DetailAnimeResponseSchema:
     updated_on: Optional[date] = None
     banner: Optional[str] = None
     sinopsis: Optional[str] = None
-    episodes: Optional[Union[List[dict], dict]] = None
     genres: Optional[List[str]] = None
+    updated_at: Optional[int] = None
+    episode_count: int = 0
+    latest_episode: Optional[EpisodeResponseSchema] = None
 
 
 
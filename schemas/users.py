@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
 
 
 class UserRegisterSchema(BaseModel):
@@ -18,6 +18,12 @@ class UserUpdateSchema(BaseModel):
     password: str
 
 
+class UserPrincipalSchema(BaseModel):
+    id: int
+    uuid: str
+    email: str
+
+
 class UserProfileSchema(BaseModel):
     id: int
     email: str
@@ -39,6 +45,33 @@ class AddBookmarkSchema(BaseModel):
     url: str
 
 
+class BookmarkBulkAddSchema(BaseModel):
+    bookmarks: List[AddBookmarkSchema] = Field(..., max_length=1000)
+
+
+class BookmarkBulkAddResponseSchema(BaseModel):
+    added: List[int]
+    existing: List[int]
+    missing: List[int]
+
+
+class BookmarkBulkRemoveSchema(BaseModel):
+    content_ids: List[int] = Field(..., max_length=1000)
+
+
+class BookmarkBulkRemoveResponseSchema(BaseModel):
+    removed: List[int]
+    not_found: List[int]
+
+
+class BookmarkCheckSchema(BaseModel):
+    content_ids: List[int] = Field(..., max_length=500)
+
+
+class BookmarkCheckResponseSchema(BaseModel):
+    bookmarked: List[int]
+
+
 class ListingBookmarksSchema(BaseModel):
     id: int
     url: str
@@ -53,4 +86,23 @@ class BookmarkResponseSchema(BaseModel):
     created_at: int
     anime_title: Optional[str] = None
     anime_banner: Optional[str] = None
-    anime_status: Optional[str] = None
\ No newline at end of file
+    anime_status: Optional[str] = None
+
+
+class CompactBookmarkSchema(BaseModel):
+    id: int
+    url: str
+    content_id: int
+    created_at: int
+
+
+class FilterBookmarks(BaseModel):
+    per_page: int = Field(50, ge=1, le=200)
+    cursor: Optional[str] = None
+    compact: bool = False
+
+
+class BookmarkListingResponse(BaseModel):
+    per_page: int
+    data: List[Union[BookmarkResponseSchema, CompactBookmarkSchema]]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Genre filter benchmark
+======================
+
+Compares the legacy ``genres ? 'Action'`` filter against the ``@>`` containment
+queries used by ``anime_filter_conditions``, before and after the
+``jsonb_path_ops`` GIN index, on a synthetic catalog in a TEMP table.
+
+Run from the repository root against a scratch database:
+
+    DB=postgresql+asyncpg://... python -m scripts.bench_genre_filter --rows 500000
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Dict, List
+
+from sqlalchemy import text
+
+from core.db import engine
+
+GENRES = [
+    "Action", "Adventure", "Comedy", "Drama", "Fantasy", "Horror", "Isekai",
+    "Mecha", "Music", "Mystery", "Romance", "School", "Sci-Fi", "Seinen",
+    "Shounen", "Slice of Life", "Sports", "Supernatural", "Thriller",
+]
+
+QUERIES: Dict[str, str] = {
+    "legacy ? (single)": "genres ? 'Action'",
+    "@> (single)": "genres @> '[\"Action\"]'",
+    "@> (all: Action+Comedy)": "genres @> '[\"Action\", \"Comedy\"]'",
+    "OR of @> (any: Mecha|Music)": "genres @> '[\"Mecha\"]' OR genres @> '[\"Music\"]'",
+}
+
+
+async def measure(conn, where: str, runs: int) -> float:
+    """Best-of-N execution time (ms) of a paged listing query."""
+    best = None
+    for _ in range(runs):
+        plan = (await conn.execute(text(
+            "EXPLAIN (ANALYZE, FORMAT JSON) "
+            f"SELECT id FROM bench_animes WHERE {where} ORDER BY id DESC LIMIT 20"
+        ))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        elapsed = plan[0]["Execution Time"]
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+async def main(rows: int, runs: int) -> None:
+    genres_sql = "ARRAY[" + ", ".join(f"'{name}'" for name in GENRES) + "]"
+
+    async with engine.connect() as conn:
+        await conn.execute(text(
+            "CREATE TEMP TABLE bench_animes (id bigserial PRIMARY KEY, genres jsonb)"
+        ))
+        # ~15% chance per genre; "n * 0" keeps the subquery correlated so it runs per row
+        await conn.execute(text(
+            "INSERT INTO bench_animes (genres) "
+            "SELECT coalesce((SELECT jsonb_agg(g) FROM unnest(" + genres_sql + ") AS g "
+            "WHERE random() < 0.15 + n * 0), '[]'::jsonb) "
+            "FROM generate_series(1, :rows) AS n"
+        ), {"rows": rows})
+        await conn.execute(text("ANALYZE bench_animes"))
+
+        before: Dict[str, float] = {}
+        for name, where in QUERIES.items():
+            before[name] = await measure(conn, where, runs)
+
+        await conn.execute(text(
+            "CREATE INDEX ix_bench_animes_genres ON bench_animes USING gin (genres jsonb_path_ops)"
+        ))
+        await conn.execute(text("ANALYZE bench_animes"))
+
+        after: Dict[str, float] = {}
+        for name, where in QUERIES.items():
+            after[name] = await measure(conn, where, runs)
+
+        await conn.rollback()
+
+    await engine.dispose()
+
+    print(f"\n📊 Genre filter benchmark ({rows:,} rows, best of {runs})\n")
+    print(f"{'query':<32}{'no index (ms)':>16}{'GIN (ms)':>12}{'speedup':>10}")
+    for name in QUERIES:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<32}{before[name]:>16.2f}{after[name]:>12.2f}{speedup:>9.1f}x")
+    print("\n'legacy ?' cannot use a jsonb_path_ops index, which is why the listing uses @>.")
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark JSONB genre filtering")
+    parser.add_argument("--rows", type=int, default=200_000, help="synthetic catalog size")
+    parser.add_argument("--runs", type=int, default=5, help="runs per query, best is reported")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(main(args.rows, args.runs))
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+🧭 Crawl Frontier
+=================
+
+Persistent checkpoint of a crawl, stored in SQLite next to scraper.log.
+
+✨ Features:
+- One row per anime URL: state, attempt count and last error
+- States: pending -> fetched -> submitted, or failed
+- A run that dies halfway resumes from its remaining URLs instead of starting over
+- Failed URLs can be retried on their own (--retry-failed)
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+PENDING = 'pending'
+FETCHED = 'fetched'
+SUBMITTED = 'submitted'
+FAILED = 'failed'
+
+
+class CrawlFrontier:
+    """📌 URL states of the current crawl run, kept across crashes and deploys."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS frontier (
+            url TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            state TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            updated_at INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_frontier_state ON frontier (state, position);
+        CREATE TABLE IF NOT EXISTS run (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        # Only the crawler's event loop thread touches the connection
+        self.conn = sqlite3.connect(self.path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _get(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM run WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: str) -> None:
+        self.conn.execute(
+            "INSERT INTO run (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    def unfinished(self) -> bool:
+        """⏸️ True when the last run stopped before every URL was handled."""
+        return self._get('status') == 'running' and bool(self.urls(PENDING, FETCHED))
+
+    def start_run(self, urls: Iterable[str]) -> None:
+        """🆕 Replace the frontier with a fresh list of URLs, all pending."""
+        now = int(time.time())
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute("DELETE FROM frontier")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, position, state, updated_at) VALUES (?, ?, ?, ?)",
+                ((url, position, PENDING, now) for position, url in enumerate(urls))
+            )
+            self._set('status', 'running')
+            self._set('started_at', str(now))
+
+    def resume_run(self) -> None:
+        """▶️ Mark the existing frontier as the active run again (resume or retry)."""
+        self._set('status', 'running')
+
+    def finish_run(self) -> None:
+        """🏁 Nothing left to resume; failed URLs stay available for --retry-failed."""
+        self._set('status', 'finished')
+
+    def urls(self, *states: str) -> List[str]:
+        """📋 URLs in any of ``states``, in the original list order."""
+        placeholders = ", ".join("?" for _ in states)
+        rows = self.conn.execute(
+            f"SELECT url FROM frontier WHERE state IN ({placeholders}) ORDER BY position",
+            states
+        ).fetchall()
+        return [url for url, in rows]
+
+    def _mark(self, url: str, state: str, error: Optional[str] = None, attempt: bool = False) -> None:
+        self.conn.execute(
+            """
+            UPDATE frontier SET
+                state = ?,
+                attempts = attempts + ?,
+                last_error = ?,
+                updated_at = ?
+            WHERE url = ?
+            """,
+            (state, 1 if attempt else 0, error, int(time.time()), url)
+        )
+
+    def mark_fetched(self, url: str) -> None:
+        """📥 Scraped, waiting for the batch submission."""
+        self._mark(url, FETCHED, attempt=True)
+
+    def mark_submitted(self, url: str) -> None:
+        """✅ Accepted by the backend (or unchanged since the last accepted version)."""
+        self._mark(url, SUBMITTED)
+
+    def mark_failed(self, url: str, error: str) -> None:
+        """❌ Scraping or submission failed; kept for --retry-failed."""
+        # A scrape failure is an attempt of its own; a rejected submission already counted one
+        current = self.conn.execute("SELECT state FROM frontier WHERE url = ?", (url,)).fetchone()
+        self._mark(url, FAILED, error=error[:500], attempt=not current or current[0] != FETCHED)
+
+    def counts(self) -> Dict[str, int]:
+        """📊 Number of URLs per state."""
+        rows = self.conn.execute("SELECT state, COUNT(*) FROM frontier GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+⚡ Async Fetch Engine
+=====================
+
+Shared asyncio HTTP engine for the Otakudesu and Oploverz scrapers.
+
+✨ Features:
+- One pooled httpx.AsyncClient (keep-alive connections are reused across pages)
+- Per-host concurrency limits so a big crawl never hammers a single site
+- Small retry with backoff for transient network errors and 5xx responses
+- Optional conditional revalidation against an on-disk HttpCache (get_page)
+"""
+
+import asyncio
+import logging
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    from scripts.http_cache import HttpCache
+except ImportError:  # run as a file from inside scripts/
+    from http_cache import HttpCache
+
+# httpx logs every request at INFO, which would flood scraper.log
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+class Page(NamedTuple):
+    url: str
+    text: str
+    # True when this exact version was already processed by an earlier run
+    unchanged: bool = False
+
+
+class FetchEngine:
+    """🌐 Concurrent page fetcher with per-host limits and a shared connection pool."""
+
+    def __init__(
+        self,
+        per_host: int = 8,
+        max_connections: int = 64,
+        timeout: float = 30.0,
+        retries: int = 2,
+        headers: Optional[Dict[str, str]] = None,
+        cache: Optional[HttpCache] = None,
+    ):
+        self.per_host = per_host
+        self.retries = retries
+        self.cache = cache
+        self.client = httpx.AsyncClient(
+            headers=headers,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self.stats = {'requests': 0, 'errors': 0, 'retries': 0}
+
+    async def __aenter__(self) -> "FetchEngine":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self._host_limits[host]
+
+    async def get(self, url: str, timeout: Optional[float] = None, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """📥 GET a URL under its host's concurrency limit; raises httpx.HTTPError on failure."""
+        attempt = 0
+        while True:
+            try:
+                async with self._host_limit(url):
+                    self.stats['requests'] += 1
+                    response = await self.client.get(
+                        url,
+                        timeout=timeout if timeout is not None else self.client.timeout,
+                        headers=headers,
+                    )
+            except httpx.TransportError:
+                if attempt >= self.retries:
+                    self.stats['errors'] += 1
+                    raise
+            else:
+                # only 5xx is worth retrying; 4xx will not change on a second try
+                if response.status_code < 500 or attempt >= self.retries:
+                    # 304 answers a revalidation request and is not an error here
+                    if response.is_error:
+                        self.stats['errors'] += 1
+                        response.raise_for_status()
+                    return response
+
+            attempt += 1
+            self.stats['retries'] += 1
+            await asyncio.sleep(0.5 * 2 ** attempt)
+
+    async def get_text(self, url: str, timeout: Optional[float] = None) -> str:
+        """📄 GET a URL and return the decoded body."""
+        response = await self.get(url, timeout=timeout)
+        return response.text
+
+    async def get_page(self, url: str, timeout: Optional[float] = None) -> Page:
+        """🔁 GET a URL, revalidating against the HttpCache when one is configured."""
+        if self.cache is None:
+            response = await self.get(url, timeout=timeout)
+            return Page(url, response.text)
+
+        entry = self.cache.lookup(url)
+        response = await self.get(url, timeout=timeout, headers=self.cache.conditional_headers(entry))
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.revalidated(url, response.headers.get('etag'), response.headers.get('last-modified'))
+            body, encoding, body_hash = entry.body, entry.encoding, entry.body_hash
+        else:
+            body, encoding = response.content, response.encoding
+            body_hash = self.cache.store(
+                url, body,
+                etag=response.headers.get('etag'),
+                last_modified=response.headers.get('last-modified'),
+                encoding=encoding,
+                previous=entry,
+            )
+
+        unchanged = entry is not None and entry.processed_hash == body_hash
+        return Page(url, body.decode(encoding or 'utf-8', errors='replace'), unchanged)
+
+    def mark_processed(self, url: str) -> None:
+        """✅ Remember that the current version of ``url`` made it to the backend."""
+        if self.cache is not None:
+            self.cache.mark_processed(url)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+💾 HTTP Revalidation Cache
+==========================
+
+Persistent on-disk cache for the scrapers' page fetches, stored in SQLite.
+
+✨ Features:
+- Remembers ETag / Last-Modified per URL and sends If-None-Match / If-Modified-Since
+- Keeps a compressed copy of each body, so a 304 still yields the page text
+- Body hash per URL, so servers without validators are detected as unchanged too
+- "Processed" marker per URL: a page only counts as unchanged once its current
+  version has been submitted successfully with every episode video URL resolved,
+  so a failed or --metadata-only run never hides data
+"""
+
+import hashlib
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Union
+
+
+class CachedPage(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    encoding: Optional[str]
+    body_hash: str
+    body: bytes
+    processed_hash: Optional[str]
+
+
+class HttpCache:
+    """🗄️ URL -> validators, body hash and body, kept across crawler runs."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            encoding TEXT,
+            body_hash TEXT NOT NULL,
+            body BLOB NOT NULL,
+            processed_hash TEXT,
+            fetched_at INTEGER NOT NULL
+        )
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        # Only the crawler's event loop thread touches the connection
+        self.conn = sqlite3.connect(self.path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(self.SCHEMA)
+        self.stats = {'not_modified': 0, 'same_body': 0, 'changed': 0, 'new': 0}
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @staticmethod
+    def body_hash(body: bytes) -> str:
+        return hashlib.sha256(body).hexdigest()
+
+    def lookup(self, url: str) -> Optional[CachedPage]:
+        """🔎 Cached entry for ``url``, if any."""
+        row = self.conn.execute(
+            "SELECT etag, last_modified, encoding, body_hash, body, processed_hash FROM pages WHERE url = ?",
+            (url,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        etag, last_modified, encoding, body_hash, body, processed_hash = row
+        return CachedPage(etag, last_modified, encoding, body_hash, zlib.decompress(body), processed_hash)
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CachedPage]) -> Dict[str, str]:
+        """📨 If-None-Match / If-Modified-Since for a revalidation request."""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(
+        self,
+        url: str,
+        body: bytes,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        encoding: Optional[str],
+        previous: Optional[CachedPage] = None
+    ) -> str:
+        """💾 Save a freshly downloaded body; returns its hash."""
+        body_hash = self.body_hash(body)
+
+        if previous is None:
+            self.stats['new'] += 1
+        elif previous.body_hash == body_hash:
+            self.stats['same_body'] += 1
+        else:
+            self.stats['changed'] += 1
+
+        self.conn.execute(
+            """
+            INSERT INTO pages (url, etag, last_modified, encoding, body_hash, body, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                encoding = excluded.encoding,
+                body_hash = excluded.body_hash,
+                body = excluded.body,
+                fetched_at = excluded.fetched_at
+            """,
+            (url, etag, last_modified, encoding, body_hash, zlib.compress(body), int(time.time()))
+        )
+        return body_hash
+
+    def revalidated(self, url: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """🔁 Record a 304; servers may send refreshed validators with it."""
+        self.stats['not_modified'] += 1
+        self.conn.execute(
+            """
+            UPDATE pages SET
+                etag = COALESCE(?, etag),
+                last_modified = COALESCE(?, last_modified),
+                fetched_at = ?
+            WHERE url = ?
+            """,
+            (etag, last_modified, int(time.time()), url)
+        )
+
+    def mark_processed(self, url: str) -> None:
+        """✅ The current version of ``url`` was parsed and submitted successfully."""
+        self.conn.execute("UPDATE pages SET processed_hash = body_hash WHERE url = ?", (url,))
@@ -11,23 +11,44 @@ that extracts anime data and pushes it to the FastAPI backend.
 - Robust error handling and logging
 - Professional class-based architecture
 - Real-time progress tracking
+- Concurrent async fetching with per-host limits (--concurrency)
+- Episode pages resolved in parallel; --skip-known skips episodes the backend already has
+- --metadata-only leaves video URLs to the backend, which resolves them on first view
+- Conditional revalidation cache: unchanged pages are neither parsed nor resubmitted
+- Resumable crawl frontier: an interrupted run continues where it stopped (--retry-failed, --fresh)
 
 Author: AnimexBE Team
 Version: 2.1 - Pretty Edition
 """
 
+import argparse
+import asyncio
 import json
 import logging
 import sys
-import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 from urllib.parse import urljoin
 
+import httpx
 import requests
 from bs4 import BeautifulSoup
 
+try:
+    from scripts.fetch_engine import FetchEngine
+    from scripts.http_cache import HttpCache
+    from scripts.crawl_frontier import CrawlFrontier, PENDING, FETCHED, FAILED
+except ImportError:  # run as a file from inside scripts/
+    from fetch_engine import FetchEngine
+    from http_cache import HttpCache
+    from crawl_frontier import CrawlFrontier, PENDING, FETCHED, FAILED
+    # helpers/ sits next to scripts/ in the repository root
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Same iframe extraction as the API's on-demand resolver, so both agree on a page's video URL
+from helpers.video_url import extract_iframe_src
+
 # Rich imports for beautiful console output
 try:
     from rich.console import Console
@@ -82,10 +103,28 @@ class Config:
         'Accept': 'application/json'
     }
     
+    # Number of anime sent per /admin/add-anime/batch request (server max is 500)
+    BATCH_SIZE = 25
+    
+    # Number of anime scraped in parallel (override with --concurrency)
+    CONCURRENCY = 8
+    
+    # Max in-flight requests to one website host, shared by all anime and episodes
+    PER_HOST_LIMIT = 8
+    
+    # Episode pages of one anime resolved in parallel (override with --episode-concurrency)
+    EPISODE_CONCURRENCY = 16
+    
     # Output Configuration
     OUTPUT_FILE = Path("oploverz_data.json")
     LOG_FILE = Path("scraper.log")
     
+    # ETag / Last-Modified / body hash per page, reused across runs (disable with --no-http-cache)
+    HTTP_CACHE_FILE = Path("http_cache.sqlite3")
+    
+    # Checkpoint of the current run, next to the log file (see crawl_frontier.py)
+    FRONTIER_FILE = LOG_FILE.with_name("oploverz_frontier.sqlite3")
+    
     # Visual Configuration
     COLORS = {
         'success': 'green',
@@ -263,6 +302,20 @@ class OploverzAPI:
             print_beautiful(f"Invalid response format: {e}", "error", "❌")
             return None
     
+    def get_known_episodes(self, title: str) -> Set[str]:
+        """🗂️ Episode numbers the backend already has a video URL for (empty on error)."""
+        try:
+            url = f"{self.base_url}/admin/known-episodes"
+            params = {"api_key": self.api_key, "title": title}
+            
+            response = self.session.get(url, params=params, timeout=30)
+            response.raise_for_status()
+            
+            return set(response.json().get('numbers', []))
+            
+        except (requests.RequestException, ValueError, AttributeError):
+            return set()
+    
     def submit_anime_data(self, anime_data: Dict[str, Any]) -> bool:
         """📤 Submit anime data to the backend."""
         try:
@@ -282,26 +335,62 @@ class OploverzAPI:
         except requests.RequestException as e:
             print_beautiful(f"Failed to submit: {anime_data.get('title', 'Unknown')}", "error", "❌")
             return False
+    
+    def submit_anime_batch(self, anime_batch: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """📦 Submit many anime in one request; returns the per-item status list."""
+        try:
+            url = f"{self.base_url}/admin/add-anime/batch"
+            params = {"api_key": self.api_key}
+            
+            response = self.session.post(
+                url,
+                params=params,
+                json=anime_batch,
+                timeout=120
+            )
+            response.raise_for_status()
+            
+            return response.json()
+            
+        except (requests.RequestException, ValueError) as e:
+            print_beautiful(f"Failed to submit batch of {len(anime_batch)} anime: {e}", "error", "❌")
+            return None
+
+
+# Returned by scrape_anime_details when the page did not change since its last successful submission
+UNCHANGED: Dict[str, Any] = {'unchanged': True}
 
 
 class OploverzScraper:
     """🕷️ Web scraper for Oploverz anime data."""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': Config.HEADERS['User-Agent']
-        })
+    def __init__(
+        self,
+        engine: FetchEngine,
+        episode_concurrency: int = Config.EPISODE_CONCURRENCY,
+        known_episodes: Optional[Callable[[str], Awaitable[Set[str]]]] = None,
+        metadata_only: bool = False
+    ):
+        self.engine = engine
+        self.episode_concurrency = episode_concurrency
+        # Skip episode pages entirely; the backend resolves video URLs on demand
+        self.metadata_only = metadata_only
+        # Looks up episode numbers to skip by anime title; None resolves every episode
+        self.known_episodes = known_episodes
+        self.skipped_episodes = 0
+        # Last scrape error per anime URL, recorded in the crawl frontier
+        self.errors: Dict[str, str] = {}
+        # Anime submitted without every video URL; never marked processed in the HTTP cache
+        self.incomplete: Set[str] = set()
     
-    def get_anime_list(self, base_url: str = 'https://oploverz.now/anime/list-mode/') -> List[str]:
+    async def get_anime_list(self, base_url: str = 'https://oploverz.now/anime/list-mode/') -> List[str]:
         """📋 Extract all anime URLs from the anime list page."""
         try:
             print_beautiful(f"Fetching anime list from: {base_url}", "info", "📋")
             
-            response = self.session.get(base_url, timeout=30)
-            response.raise_for_status()
+            page = await self.engine.get_page(base_url, timeout=30)
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(page.text, 'html.parser')
             anime_links = set()
             
             for a_tag in soup.find_all('a', href=True):
@@ -315,28 +404,20 @@ class OploverzScraper:
             print_beautiful(f"Found {len(anime_list)} anime entries", "success", "🎬")
             return anime_list
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print_beautiful(f"Failed to fetch anime list: {e}", "error", "❌")
             return []
         except Exception as e:
             print_beautiful(f"Unexpected error: {e}", "error", "💥")
             return []
     
-    def scrape_episode_details(self, episode_url: str) -> Optional[str]:
+    async def scrape_episode_details(self, episode_url: str) -> Optional[str]:
         """🎬 Extract video URL from episode page."""
         try:
-            response = self.session.get(episode_url, timeout=20)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            iframe = soup.find('iframe')
-            
-            if iframe and iframe.has_attr('src'):
-                return iframe['src']
+            page = await self.engine.get_page(episode_url, timeout=20)
+            return extract_iframe_src(page.text)
             
-            return None
-            
-        except requests.RequestException:
+        except httpx.HTTPError:
             return None
         except Exception:
             return None
@@ -392,8 +473,8 @@ class OploverzScraper:
         
         return info_data
     
-    def extract_episodes(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        """🎞️ Extract episode information from anime page."""
+    async def extract_episodes(self, soup: BeautifulSoup, known: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """🎞️ Extract episode information from anime page, skipping numbers in ``known``."""
         episodes = []
         eps_section = soup.find('div', class_='eplister')
         
@@ -420,22 +501,39 @@ class OploverzScraper:
                 'video_url': None
             }
             
-            # Get video URL if episode link exists
-            if ep_link:
-                video_url = self.scrape_episode_details(ep_link)
-                episode_data['video_url'] = video_url
+            if known and episode_data['number'] in known:
+                self.skipped_episodes += 1
+                continue
             
             episodes.append(episode_data)
         
+        await self.resolve_episodes(episodes)
         return episodes
     
-    def scrape_anime_details(self, anime_url: str) -> Optional[Dict[str, Any]]:
+    async def resolve_episodes(self, episodes: List[Dict[str, Any]]) -> None:
+        """⚡ Open episode pages in parallel, at most ``episode_concurrency`` at a time for this anime."""
+        if self.metadata_only:
+            return
+        
+        budget = asyncio.Semaphore(self.episode_concurrency)
+        
+        async def resolve(episode_data: Dict[str, Any]) -> None:
+            # Get video URL if episode link exists
+            if not episode_data['url']:
+                return
+            async with budget:
+                episode_data['video_url'] = await self.scrape_episode_details(episode_data['url'])
+        
+        await asyncio.gather(*(resolve(episode_data) for episode_data in episodes))
+    
+    async def scrape_anime_details(self, anime_url: str) -> Optional[Dict[str, Any]]:
         """🎭 Extract comprehensive anime details from anime page."""
         try:
-            response = self.session.get(anime_url, timeout=30)
-            response.raise_for_status()
+            page = await self.engine.get_page(anime_url, timeout=30)
+            if page.unchanged:
+                return UNCHANGED
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(page.text, 'html.parser')
             
             # Extract basic info
             info_section = soup.find('div', class_='infox')
@@ -452,8 +550,15 @@ class OploverzScraper:
                 p_tag = sinopsis_div.find('p')
                 sinopsis = p_tag.text.strip() if p_tag else None
             
-            # Extract episodes
-            episodes = self.extract_episodes(soup)
+            # Extract episodes, skipping the ones the backend already has
+            known = None
+            if self.known_episodes and anime_info['title']:
+                known = await self.known_episodes(anime_info['title'])
+            episodes = await self.extract_episodes(soup, known)
+            if self.metadata_only or not all(episode.get('video_url') for episode in episodes):
+                self.incomplete.add(anime_url)
+            else:
+                self.incomplete.discard(anime_url)
             
             # Parse release date
             released_on = None
@@ -489,30 +594,58 @@ class OploverzScraper:
             
             return anime_data
             
-        except requests.RequestException:
+        except httpx.HTTPError as e:
+            self.errors[anime_url] = f"{type(e).__name__}: {e}"
             return None
-        except Exception:
+        except Exception as e:
+            self.errors[anime_url] = f"{type(e).__name__}: {e}"
             return None
 
 
 class OploverzCrawler:
     """🤖 Main crawler orchestrator with beautiful output."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        concurrency: int = Config.CONCURRENCY,
+        per_host: int = Config.PER_HOST_LIMIT,
+        episode_concurrency: int = Config.EPISODE_CONCURRENCY,
+        skip_known: bool = False,
+        metadata_only: bool = False,
+        http_cache: bool = True,
+        resume: bool = True,
+        retry_failed: bool = False
+    ):
         self.api_client = OploverzAPI()
-        self.scraper = OploverzScraper()
+        self.scraper: Optional[OploverzScraper] = None
         self.discord = DiscordNotifier()
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.episode_concurrency = episode_concurrency
+        self.skip_known = skip_known
+        self.metadata_only = metadata_only
+        self.http_cache = http_cache
+        self.resume = resume
+        self.retry_failed = retry_failed
+        self.frontier: Optional[CrawlFrontier] = None
         self.scraped_data: List[Dict[str, Any]] = []
+        # (anime_url, anime_data) waiting for the next batch submission
+        self.pending_submissions: List[Tuple[str, Dict[str, Any]]] = []
         self.stats = {
             'total_processed': 0,
             'successful_submissions': 0,
             'failed_submissions': 0,
+            'unchanged': 0,
             'start_time': None,
             'end_time': None
         }
     
     def run(self) -> bool:
         """🚀 Execute the complete crawling process with beautiful progress tracking."""
+        return asyncio.run(self.run_async())
+    
+    async def run_async(self) -> bool:
+        """🚀 Async body of ``run``; all website fetches share one FetchEngine."""
         show_banner()
         
         print_beautiful("Initializing Oploverz Crawler...", "info", "🚀")
@@ -532,34 +665,94 @@ class OploverzCrawler:
             print_beautiful("Using default URL...", "warning", "⚠️")
             target_url = "https://oploverz.my/anime/list-mode/"
         
-        # Step 3: Get anime list
-        anime_urls = self.scraper.get_anime_list(target_url)
-        if not anime_urls:
-            print_beautiful("No anime URLs found. Aborting.", "error", "❌")
-            return False
+        cache = HttpCache(Config.HTTP_CACHE_FILE) if self.http_cache else None
+        self.frontier = CrawlFrontier(Config.FRONTIER_FILE)
+        engine = FetchEngine(per_host=self.per_host, headers={'User-Agent': Config.HEADERS['User-Agent']}, cache=cache)
         
-        # Step 4: Process each anime with beautiful progress
-        self.process_anime_with_progress(anime_urls)
+        try:
+            self.scraper = OploverzScraper(
+                engine,
+                episode_concurrency=self.episode_concurrency,
+                known_episodes=self.fetch_known_episodes if self.skip_known else None,
+                metadata_only=self.metadata_only
+            )
+            
+            # Step 3: Get anime list (or what is left of an interrupted run)
+            anime_urls = await self.select_urls(target_url)
+            if not anime_urls:
+                print_beautiful("No anime URLs found. Aborting.", "error", "❌")
+                return False
+            
+            # Step 4: Process anime concurrently with beautiful progress
+            await self.process_anime_with_progress(anime_urls)
+            
+            # Every URL is now submitted or failed; a crash before this line resumes next run
+            if not self.frontier.urls(PENDING, FETCHED):
+                self.frontier.finish_run()
+        finally:
+            await engine.close()
+            if cache:
+                cache.close()
+            self.frontier.close()
         
         # Step 5: Save results and show summary
         self.save_results()
         self.show_final_summary()
         
-        return self.stats['successful_submissions'] > 0
+        return self.stats['successful_submissions'] > 0 or self.stats['unchanged'] > 0
+    
+    async def select_urls(self, target_url: str) -> List[str]:
+        """🧭 Failed URLs (--retry-failed), the rest of an interrupted run, or a fresh anime list."""
+        if self.retry_failed:
+            anime_urls = self.frontier.urls(FAILED)
+            print_beautiful(f"Retrying {len(anime_urls)} failed anime from the last run", "info", "🔁")
+            self.frontier.resume_run()
+            return anime_urls
+        
+        if self.resume and self.frontier.unfinished():
+            anime_urls = self.frontier.urls(PENDING, FETCHED)
+            print_beautiful(f"Resuming interrupted run: {len(anime_urls)} anime left", "info", "⏯️")
+            self.frontier.resume_run()
+            return anime_urls
+        
+        anime_urls = await self.scraper.get_anime_list(target_url)
+        if anime_urls:
+            self.frontier.start_run(anime_urls)
+        return anime_urls
+    
+    async def fetch_known_episodes(self, title: str) -> Set[str]:
+        """🗂️ Ask the backend which episodes of ``title`` are already resolved."""
+        return await asyncio.to_thread(self.api_client.get_known_episodes, title)
     
-    def process_anime_with_progress(self, anime_urls: List[str]) -> None:
+    async def process_anime_with_progress(self, anime_urls: List[str]) -> None:
         """⚡ Process anime with beautiful progress bars."""
         total_anime = len(anime_urls)
         self.stats['total_processed'] = total_anime
         
-        print_beautiful(f"Starting to process {total_anime} anime...", "info", "⚡")
+        print_beautiful(f"Starting to process {total_anime} anime ({self.concurrency} at a time)...", "info", "⚡")
         
         if RICH_AVAILABLE and console:
-            self.process_with_rich_progress(anime_urls)
+            await self.process_with_rich_progress(anime_urls)
         else:
-            self.process_with_simple_progress(anime_urls)
+            await self.process_with_simple_progress(anime_urls)
     
-    def process_with_rich_progress(self, anime_urls: List[str]) -> None:
+    async def scrape_concurrently(self, anime_urls: List[str]):
+        """🔀 Scrape up to ``self.concurrency`` anime at once, yielding (url, data) as each finishes."""
+        limit = asyncio.Semaphore(self.concurrency)
+        
+        async def scrape(anime_url: str):
+            async with limit:
+                return anime_url, await self.scraper.scrape_anime_details(anime_url)
+        
+        tasks = [asyncio.create_task(scrape(anime_url)) for anime_url in anime_urls]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def process_with_rich_progress(self, anime_urls: List[str]) -> None:
         """🌈 Process with Rich progress bars."""
         with Progress(
             SpinnerColumn(),
@@ -573,63 +766,83 @@ class OploverzCrawler:
             
             task = progress.add_task("🎬 Scraping anime...", total=len(anime_urls))
             
-            for index, anime_url in enumerate(anime_urls, 1):
-                # Update progress description with current anime
+            async for anime_url, anime_data in self.scrape_concurrently(anime_urls):
+                # Update progress description with the anime that just finished
                 anime_name = anime_url.split('/')[-2] if anime_url.endswith('/') else anime_url.split('/')[-1]
-                progress.update(task, description=f"🎬 Processing: {anime_name[:30]}...")
-                
-                # Scrape anime details
-                anime_data = self.scraper.scrape_anime_details(anime_url)
-                if not anime_data:
-                    self.stats['failed_submissions'] += 1
-                    progress.advance(task)
-                    continue
+                progress.update(task, description=f"🎬 Processed: {anime_name[:30]}...")
                 
-                # Submit to API
-                if self.api_client.submit_anime_data(anime_data):
-                    self.stats['successful_submissions'] += 1
-                    self.scraped_data.append(anime_data)
-                    
-                    # Send Discord notification every 5 successful submissions
-                    if index % 5 == 0:
-                        self.discord.send_message(f"✅ [{index}/{len(anime_urls)}] '{anime_data.get('title', 'Unknown')}' berhasil dikirim ke API")
-                    
-                    # Show success message occasionally
-                    if index % 5 == 0:
-                        console.print(f"✅ Successfully processed: [green]{anime_data.get('title', 'Unknown')}[/green]")
-                else:
-                    self.stats['failed_submissions'] += 1
+                await self.handle_result(anime_url, anime_data)
                 
                 progress.advance(task)
-                
-                # Small delay to not overwhelm the server
-                time.sleep(0.1)
+            
+            await self.flush_submissions()
     
-    def process_with_simple_progress(self, anime_urls: List[str]) -> None:
+    async def process_with_simple_progress(self, anime_urls: List[str]) -> None:
         """📈 Process with simple progress indicators."""
         total_anime = len(anime_urls)
+        index = 0
         
-        for index, anime_url in enumerate(anime_urls, 1):
-            print(f"[{index}/{total_anime}] ({index/total_anime*100:.1f}%) Processing anime...")
+        async for anime_url, anime_data in self.scrape_concurrently(anime_urls):
+            index += 1
+            print(f"[{index}/{total_anime}] ({index/total_anime*100:.1f}%) Processed anime...")
             
-            # Scrape anime details
-            anime_data = self.scraper.scrape_anime_details(anime_url)
-            if not anime_data:
+            await self.handle_result(anime_url, anime_data)
+        
+        await self.flush_submissions()
+    
+    async def handle_result(self, anime_url: str, anime_data: Optional[Dict[str, Any]]) -> None:
+        """🗂️ Record one scraped anime in the frontier and queue it for submission."""
+        if anime_data is UNCHANGED:
+            self.stats['unchanged'] += 1
+            self.frontier.mark_submitted(anime_url)
+            return
+        
+        if not anime_data:
+            self.stats['failed_submissions'] += 1
+            self.frontier.mark_failed(anime_url, self.scraper.errors.pop(anime_url, "no data scraped"))
+            return
+        
+        # Queue for batch submission to API
+        self.frontier.mark_fetched(anime_url)
+        await self.queue_submission(anime_url, anime_data)
+    
+    async def queue_submission(self, anime_url: str, anime_data: Dict[str, Any]) -> None:
+        """📥 Buffer scraped anime and submit them once a batch is full."""
+        self.pending_submissions.append((anime_url, anime_data))
+        if len(self.pending_submissions) >= Config.BATCH_SIZE:
+            await self.flush_submissions()
+    
+    async def flush_submissions(self) -> None:
+        """📦 Submit buffered anime with one batch request (in a thread, so scraping keeps going)."""
+        if not self.pending_submissions:
+            return
+        
+        submissions, self.pending_submissions = self.pending_submissions, []
+        batch = [anime_data for _, anime_data in submissions]
+        results = await asyncio.to_thread(self.api_client.submit_anime_batch, batch)
+        if results is None:
+            self.stats['failed_submissions'] += len(batch)
+            for anime_url, _ in submissions:
+                self.frontier.mark_failed(anime_url, "batch submission failed")
+            return
+        
+        for (anime_url, anime_data), result in zip(submissions, results):
+            if result.get('status') == 'invalid':
                 self.stats['failed_submissions'] += 1
+                self.frontier.mark_failed(anime_url, "rejected by backend as invalid")
                 continue
-            
-            # Submit to API
-            if self.api_client.submit_anime_data(anime_data):
-                self.stats['successful_submissions'] += 1
-                self.scraped_data.append(anime_data)
-                
-                # Send Discord notification every 5 successful submissions
-                if index % 5 == 0:
-                    self.discord.send_message(f"✅ [{index}/{total_anime}] '{anime_data.get('title', 'Unknown')}' berhasil dikirim ke API")
-                
-                print(f"✅ Success: {anime_data.get('title', 'Unknown')}")
-            else:
-                self.stats['failed_submissions'] += 1
+            self.stats['successful_submissions'] += 1
+            self.scraped_data.append(anime_data)
+            self.frontier.mark_submitted(anime_url)
+            # Only now may a later run treat this page as unchanged, and only if
+            # every episode resolved: otherwise the missing ones would never be retried
+            if anime_url not in self.scraper.incomplete:
+                self.scraper.engine.mark_processed(anime_url)
+        
+        print_beautiful(f"Submitted batch of {len(batch)} anime (last: {batch[-1].get('title', 'Unknown')})", "success", "✅")
+        
+        # Send Discord notification once per batch
+        await asyncio.to_thread(self.discord.send_message, f"✅ {len(batch)} anime berhasil dikirim ke API (terakhir: '{batch[-1].get('title', 'Unknown')}')")
     
     def save_results(self) -> None:
         """💾 Save scraped data to local JSON file."""
@@ -647,7 +860,9 @@ class OploverzCrawler:
         self.stats['end_time'] = datetime.now()
         duration = self.stats['end_time'] - self.stats['start_time']
         
-        success_rate = (self.stats['successful_submissions'] / self.stats['total_processed'] * 100) if self.stats['total_processed'] > 0 else 0
+        # Unchanged pages were not resubmitted, so they do not count for or against the rate
+        submitted = self.stats['total_processed'] - self.stats['unchanged']
+        success_rate = (self.stats['successful_submissions'] / submitted * 100) if submitted > 0 else 100
         
         summary_stats = {
             "Total Anime Processed": self.stats['total_processed'],
@@ -657,9 +872,16 @@ class OploverzCrawler:
             "Duration": str(duration).split('.')[0],
             "Average Speed": f"{self.stats['total_processed'] / duration.total_seconds() * 60:.1f} anime/min"
         }
+        if self.http_cache:
+            summary_stats["Unchanged (skipped)"] = self.stats['unchanged']
+        if self.skip_known and self.scraper:
+            summary_stats["Skipped Known Episodes"] = self.scraper.skipped_episodes
         
         create_summary_table(summary_stats)
         
+        if self.stats['failed_submissions']:
+            print_beautiful(f"Run again with --retry-failed to retry only the {self.stats['failed_submissions']} failed anime", "info", "🔁")
+        
         # Send final Discord notification
         if success_rate >= 90:
             message = "🎉 Scraping selesai! Semua data berhasil dikirim!"
@@ -674,10 +896,58 @@ class OploverzCrawler:
         self.discord.send_message(message)
 
 
+def parse_args() -> argparse.Namespace:
+    """⚙️ Command line options."""
+    parser = argparse.ArgumentParser(description="Oploverz anime scraper")
+    parser.add_argument(
+        "--concurrency", type=int, default=Config.CONCURRENCY,
+        help=f"number of anime scraped in parallel (default {Config.CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--per-host", type=int, default=Config.PER_HOST_LIMIT,
+        help=f"max in-flight requests to one host (default {Config.PER_HOST_LIMIT})"
+    )
+    parser.add_argument(
+        "--episode-concurrency", type=int, default=Config.EPISODE_CONCURRENCY,
+        help=f"episode pages of one anime resolved in parallel (default {Config.EPISODE_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--skip-known", action="store_true",
+        help="only open episode pages the backend does not have a video URL for yet"
+    )
+    parser.add_argument(
+        "--metadata-only", action="store_true",
+        help="do not open episode pages; video URLs are resolved by the backend on first view"
+    )
+    parser.add_argument(
+        "--no-http-cache", action="store_true",
+        help=f"re-download and resubmit every page, ignoring {Config.HTTP_CACHE_FILE}"
+    )
+    parser.add_argument(
+        "--retry-failed", action="store_true",
+        help=f"only retry the anime that failed in the last run (see {Config.FRONTIER_FILE})"
+    )
+    parser.add_argument(
+        "--fresh", action="store_true",
+        help="start a new run even if the last one was interrupted"
+    )
+    return parser.parse_args()
+
+
 def main():
     """🎯 Main entry point with beautiful error handling."""
+    args = parse_args()
     try:
-        crawler = OploverzCrawler()
+        crawler = OploverzCrawler(
+            concurrency=max(1, args.concurrency),
+            per_host=max(1, args.per_host),
+            episode_concurrency=max(1, args.episode_concurrency),
+            skip_known=args.skip_known,
+            metadata_only=args.metadata_only,
+            http_cache=not args.no_http_cache,
+            resume=not args.fresh,
+            retry_failed=args.retry_failed
+        )
         success = crawler.run()
         
         if success:
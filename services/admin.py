@@ -1,23 +1,96 @@
+import hashlib
+import json
+import re
 import secrets
 import uuid
 from datetime import datetime
-from typing import List
+from collections import Counter
+from typing import Dict, List, Tuple
 
 import attrs
-from sqlalchemy import select, func, desc, or_
+from sqlalchemy import select, func, desc, or_, tuple_, literal_column
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.engine import row
 from sqlalchemy.ext.asyncio import AsyncConnection
 
-from exceptions import AdminPasswordError, AdminIsNotLoginError
+from core.cache import anime_detail_cache, api_key_cache, site_settings_cache
+from core.invalidation import invalidation_bus, InvalidationEvent, InvalidationKind
+from exceptions import AdminPasswordError, AdminIsNotLoginError, InvalidCursorError, AnimeNotFoundError
 from helpers.authentication import PasswordHasher
+from helpers.pagination import encode_cursor, decode_cursor
 from models.admin import AdminModel
-from models.animes import AnimesModel
+from models.animes import AnimesModel, listing_year
+from models.catalog import CatalogRevisionModel
 from models.crawler import CrawlersModel
 from models.crawler_settings import CrawelerSetting
 from schemas.admin import AddCrawlerSettingsSchema, AdminLoginSchema, AdminMeResponseSchema, CrawlerSettingsResponseSchema, SettingsSiteSchema, AdminSettingsResponseSchema, \
     AddCrawlersSchema, ListingCrawlersSchema, AnimeBase, GeneralListingResponse, FilterAnime, ListingAnimeBase, \
-    DetailAnimeResponseSchema
+    DetailAnimeResponseSchema, SearchAnime, SearchAnimeResponse, FilterEpisodes, EpisodeListingResponse, \
+    IngestResultSchema, IngestStatusEnum, KnownEpisodesSchema
 from models.settings import SiteSettingsModel
+from services.anime_filters import anime_filter_conditions
+from services.anime_totals import AnimeTotals
+from services.episodes import EpisodeService, episode_rows
+
+# 18 kolom per anime, jauh di bawah batas 32767 bind parameter asyncpg
+INGEST_CHUNK = 500
+
+
+def anime_values(data: AnimeBase) -> dict:
+    """
+    kolom metadata animes dari payload crawler, termasuk ``content_hash``-nya
+
+    ``content_hash`` dipakai untuk melewati update kalau metadata tidak berubah.
+    :param data:
+    :return:
+    """
+    values = {
+        "title": data.title,
+        "status": data.status,
+        "studio": data.studio,
+        "released_year": data.released_year,
+        "season": data.season,
+        "type": data.type,
+        "director": data.director,
+        "casts": data.casts,
+        "posted_by": data.posted_by,
+        "released_on": data.released_on,
+        "updated_on": data.updated_on if data.updated_on else data.released_on,
+        "banner": data.banner,
+        "sinopsis": data.sinopsis,
+        "genres": data.genres,
+    }
+    values["content_hash"] = hashlib.sha256(
+        json.dumps(values, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+    return values
+
+
+def oversized_columns(values: dict) -> List[str]:
+    """
+    kolom ``values`` yang string-nya lebih panjang dari batas kolom di ``AnimesModel``
+
+    Dicek sebelum upsert, karena satu value kepanjangan menggagalkan seluruh statement
+    multi-row dan semua item di batch.
+    :param values: hasil ``anime_values``
+    :return: nama kolom yang kepanjangan, kosong kalau semua muat
+    """
+    oversized = []
+    for name, value in values.items():
+        length = getattr(AnimesModel.c[name].type, "length", None)
+        if length is not None and isinstance(value, str) and len(value) > length:
+            oversized.append(name)
+
+    return oversized
+
+
+def apikey_digest(api_key: str) -> str:
+    """
+    key cache untuk api key, supaya api key mentah tidak disimpan di memory cache
+    """
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
 
 @attrs.define
 class AdminCRUD:
@@ -26,9 +99,13 @@ class AdminCRUD:
 
 
     async def _check_apikey(self, api_key: str) -> bool:
+        digest = apikey_digest(api_key)
+        if api_key_cache.get(digest):
+            return True
+
         query = (
             select(
-                AdminModel
+                AdminModel.c.id
             ).select_from(
                 AdminModel
             ).where(
@@ -41,6 +118,7 @@ class AdminCRUD:
         if result is None:
             return False
 
+        api_key_cache.set(digest, True)
         return True
 
     async def login(self, data: AdminLoginSchema, hasher: PasswordHasher) -> str:
@@ -66,7 +144,7 @@ class AdminCRUD:
 
         result = (await self.conn.execute(query)).first()
 
-        if not hasher.verify(password, result.password):
+        if result is None or not await hasher.verify_async(password, result.password):
             raise AdminPasswordError
 
         return str(result.uuid)
@@ -92,6 +170,8 @@ class AdminCRUD:
             query = AdminModel.update().where(AdminModel.c.id == admin_id).values(api_key=apikey)
 
             await self.conn.execute(query)
+            # api key lama tidak boleh lolos dari cache di worker mana pun
+            await invalidation_bus.publish(self.conn, InvalidationEvent(InvalidationKind.api_key))
 
             return apikey
         except Exception as e:
@@ -147,10 +227,30 @@ class AdminCRUD:
             facebook_pixel_id=data.facebook_pixel_id,
         )
 
-        return (await self.conn.execute(query)).inserted_primary_key[0]
+        setting_id = (await self.conn.execute(query)).inserted_primary_key[0]
+        await invalidation_bus.publish(self.conn, InvalidationEvent(InvalidationKind.site_settings, [setting_id]))
+
+        return setting_id
 
 
     async def read_setting(self, setting_id: int) -> AdminSettingsResponseSchema:
+        """
+        site settings, dibaca dari cache in-process kalau ada
+        :param setting_id:
+        :return:
+        """
+        cached = site_settings_cache.get(setting_id)
+        if cached is not None:
+            return cached
+
+        return await self.load_setting(setting_id)
+
+    async def load_setting(self, setting_id: int) -> AdminSettingsResponseSchema:
+        """
+        baca site settings dari database lalu simpan ke cache
+        :param setting_id:
+        :return:
+        """
         query = select(
             SiteSettingsModel
         ).select_from(
@@ -160,7 +260,7 @@ class AdminCRUD:
         )
 
         data = (await self.conn.execute(query)).first()
-        return AdminSettingsResponseSchema(
+        settings = AdminSettingsResponseSchema(
             site_name=data.site_name,
             site_description=data.site_description,
             site_keywords=data.site_keywords,
@@ -173,6 +273,9 @@ class AdminCRUD:
             google_analytics_id=data.google_analytics_id,
             facebook_pixel_id=data.facebook_pixel_id,
         )
+        site_settings_cache.set(setting_id, settings)
+
+        return settings
 
 
     async def add_crawler(self, api_key: str, data: AddCrawlersSchema) -> bool:
@@ -240,56 +343,153 @@ class AdminCRUD:
             ) for row in result
         ]
 
+    async def authorize_crawler(self, api_key: str) -> None:
+        """
+        pastikan api key crawler valid
+        :param api_key:
+        :raise AdminIsNotLoginError: kalau api key tidak dikenal
+        """
+        if not await self._check_apikey(api_key):
+            raise AdminIsNotLoginError
+
     async def add_or_update_anime(self,api_key: str, data: AnimeBase) -> bool:
         if not await self._check_apikey(api_key):
             raise AdminIsNotLoginError
-        # Cek apakah anime dengan title ini sudah ada
-        query = (
-            select(AnimesModel.c.id)
-            .where(AnimesModel.c.title == data.title)
-        )
-        existing = await self.conn.execute(query)
-        anime = existing.first()
-
-        values = {
-            "title": data.title,
-            "status": data.status,
-            "studio": data.studio,
-            "released_year": data.released_year,
-            "season": data.season,
-            "type": data.type,
-            "director": data.director,
-            "casts": data.casts,
-            "posted_by": data.posted_by,
-            "released_on": data.released_on,
-            "updated_on": data.updated_on if data.updated_on else data.released_on,
-            "banner": data.banner,
-            "sinopsis": data.sinopsis,
-            "episodes": data.episodes,
-            "genres": data.genres,
-            "updated_at": int(datetime.utcnow().timestamp())
-        }
-
-        if anime:
-            # Kalau sudah ada, update
-            update_query = (
+
+        await self.ingest_anime(data)
+
+        return True
+
+    async def ingest_anime(self, data: AnimeBase) -> IngestResultSchema:
+        """
+        Merge satu anime dari crawler ke database, lihat ``ingest_batch``
+        :param data:
+        :return:
+        """
+        return (await self.ingest_batch([data]))[0]
+
+    async def ingest_batch(self, items: List[AnimeBase]) -> List[IngestResultSchema]:
+        """
+        Merge banyak anime dari crawler ke database dalam beberapa statement
+
+        Metadata di-upsert dengan satu ``INSERT ... ON CONFLICT (title)`` per chunk dan
+        hanya di-update kalau ``content_hash``-nya berubah. ``episodes`` boleh berisi
+        episode baru/berubah saja: episode di-merge per nomor, bukan mengganti seluruh
+        list. Kalau tidak ada yang berubah tidak ada write sama sekali dan
+        ``updated_at`` tidak naik. Title yang muncul lebih dari sekali digabung, data
+        terakhir yang menang. Item dengan title kosong atau value yang melebihi panjang
+        kolom dilaporkan ``invalid`` tanpa mengganggu item lain.
+        :param items:
+        :return: status per item, urutan sama dengan ``items``
+        """
+        now = int(datetime.utcnow().timestamp())
+        values_by_title: Dict[str, dict] = {}
+        episodes_by_title: Dict[str, list] = {}
+        invalid_items = set()
+
+        for index, item in enumerate(items):
+            values = anime_values(item)
+            if not item.title.strip() or oversized_columns(values):
+                invalid_items.add(index)
+                continue
+            values_by_title[item.title] = values
+            episodes = item.episodes if isinstance(item.episodes, list) else [item.episodes] if item.episodes else []
+            episodes_by_title.setdefault(item.title, []).extend(episodes)
+
+        titles = list(values_by_title)
+        id_by_title: Dict[str, int] = {}
+        status_by_title: Dict[str, IngestStatusEnum] = {}
+
+        for start in range(0, len(titles), INGEST_CHUNK):
+            rows = [
+                {**values_by_title[title], "uuid": uuid.uuid4(), "created_at": now, "updated_at": now}
+                for title in titles[start:start + INGEST_CHUNK]
+            ]
+            upsert_query = insert(AnimesModel).values(rows)
+            upsert_query = upsert_query.on_conflict_do_update(
+                index_elements=[AnimesModel.c.title],
+                set_={
+                    **{
+                        name: upsert_query.excluded[name]
+                        for name in rows[0] if name not in ("title", "uuid", "created_at", "updated_at")
+                    },
+                    # minimal +1 detik supaya ETag detail berubah walau ingest di detik yang sama
+                    "updated_at": func.greatest(AnimesModel.c.updated_at + 1, upsert_query.excluded.updated_at),
+                },
+                where=AnimesModel.c.content_hash.is_distinct_from(upsert_query.excluded.content_hash)
+            ).returning(
+                AnimesModel.c.id,
+                AnimesModel.c.title,
+                literal_column("xmax = 0").label("inserted"),
+            )
+
+            for row in (await self.conn.execute(upsert_query)).fetchall():
+                id_by_title[row.title] = row.id
+                status_by_title[row.title] = IngestStatusEnum.created if row.inserted else IngestStatusEnum.updated
+
+        unchanged = [title for title in titles if title not in id_by_title]
+        if unchanged:
+            query = select(AnimesModel.c.id, AnimesModel.c.title).where(AnimesModel.c.title.in_(unchanged))
+            for row in (await self.conn.execute(query)).fetchall():
+                id_by_title[row.title] = row.id
+                status_by_title[row.title] = IngestStatusEnum.unchanged
+
+        # episode disimpan di tabel episodes, bukan lagi di kolom JSONB animes.episodes
+        episode_payload = []
+        for title, episodes in episodes_by_title.items():
+            episode_payload.extend(episode_rows(id_by_title[title], episodes))
+        episodes_written = Counter(await EpisodeService(self.conn).upsert_rows(episode_payload))
+
+        # hanya episode yang berubah; versi anime tetap dinaikkan untuk ETag/detail
+        bumped = [
+            title for title in titles
+            if status_by_title[title] == IngestStatusEnum.unchanged and episodes_written[id_by_title[title]]
+        ]
+        if bumped:
+            await self.conn.execute(
                 AnimesModel.update()
-                .where(AnimesModel.c.id == anime.id)
-                .values(**values)
+                .where(AnimesModel.c.id.in_([id_by_title[title] for title in bumped]))
+                .values(updated_at=func.greatest(AnimesModel.c.updated_at + 1, now))
+            )
+            for title in bumped:
+                status_by_title[title] = IngestStatusEnum.updated
+
+        changed = [id_by_title[title] for title in titles if status_by_title[title] != IngestStatusEnum.unchanged]
+        if changed:
+            # versi listing, di transaksi yang sama supaya revision dan isi katalog terlihat bersamaan
+            await self.conn.execute(
+                CatalogRevisionModel.update()
+                .where(CatalogRevisionModel.c.id == 1)
+                .values(revision=CatalogRevisionModel.c.revision + 1)
+            )
+            await invalidation_bus.publish(
+                self.conn,
+                InvalidationEvent(InvalidationKind.anime, changed),
+                InvalidationEvent(InvalidationKind.anime_catalog),
             )
-            await self.conn.execute(update_query)
-        else:
-            # Kalau belum ada, insert
-            values["uuid"] = uuid.uuid4()
-            values["created_at"] = int(datetime.utcnow().timestamp())
-            insert_query = AnimesModel.insert().values(**values)
-            await self.conn.execute(insert_query)
 
-        return True
+        results = []
+        for index, item in enumerate(items):
+            if index in invalid_items or item.title not in id_by_title:
+                results.append(IngestResultSchema(title=item.title, status=IngestStatusEnum.invalid))
+                continue
+
+            anime_id = id_by_title[item.title]
+            results.append(IngestResultSchema(
+                title=item.title,
+                status=status_by_title[item.title],
+                anime_id=anime_id,
+                episodes_written=episodes_written[anime_id],
+            ))
+
+        return results
 
     async def listing_anime(self, data: FilterAnime) -> GeneralListingResponse:
         """
         Listing Animex
+
+        Kalau ``data.cursor`` diisi, listing memakai keyset pagination (lanjut dari
+        row terakhir halaman sebelumnya) dan ``data.page`` diabaikan.
         :param data:
         :return:
         """
@@ -301,43 +501,94 @@ class AdminCRUD:
                 AnimesModel.c.status,
                 AnimesModel.c.banner,
                 AnimesModel.c.genres,
-                AnimesModel.c.released_year
+                AnimesModel.c.released_year,
+                listing_year.label('sort_year'),
             ).select_from(
                 AnimesModel
             )
         )
 
-        if data.status:
-            query = query.where(AnimesModel.c.status == data.status)
+        query = query.where(*anime_filter_conditions(data))
 
-        if data.genre:
-            query = query.where(AnimesModel.c.genres.op('?')(data.genre))
-
-        if data.type:
-            query = query.where(AnimesModel.c.type == data.type)
-
-        if data.search:
-            query = query.where(AnimesModel.c.title.ilike(f"%{data.search}%"))
-
-        query_total = select(
-            func.count(
-                AnimesModel.c.id,
-            )
-        )
+        total, total_is_estimate = await AnimeTotals(self.conn).count(data)
 
         query = query.order_by(
-            desc(func.coalesce(AnimesModel.c.released_year, '0000')),
+            desc(listing_year),
             desc(AnimesModel.c.id)
         )
 
-        total = (await self.conn.execute(query_total)).scalar()
-
-        query = query.limit(data.per_page).offset((data.page - 1) * data.per_page)
+        if data.cursor:
+            sort_year, last_id = decode_cursor(data.cursor, 2)
+            if not isinstance(sort_year, str) or not isinstance(last_id, int):
+                raise InvalidCursorError
+            query = query.where(
+                tuple_(listing_year, AnimesModel.c.id) < tuple_(sort_year, last_id)
+            ).limit(data.per_page)
+        else:
+            query = query.limit(data.per_page).offset((data.page - 1) * data.per_page)
 
         res = (await self.conn.execute(query)).fetchall()
 
+        next_cursor = None
+        if res and len(res) == data.per_page:
+            next_cursor = encode_cursor([res[-1].sort_year, res[-1].id])
+
         return GeneralListingResponse(
             total=total,
+            total_is_estimate=total_is_estimate,
+            page=data.page,
+            per_page=data.per_page,
+            data=[
+                ListingAnimeBase(
+                    id=row.id,
+                    title=row.title,
+                    status=row.status,
+                    banner=row.banner,
+                    genres=row.genres,
+                    released_year=row.released_year,
+                ) for row in res
+            ],
+            next_cursor=next_cursor,
+        )
+
+    async def search_anime(self, data: SearchAnime) -> SearchAnimeResponse:
+        """
+        Search anime pakai full-text index ``search_vector``
+
+        Setiap kata di ``data.q`` dicocokkan sebagai prefix (``kata:*``) supaya
+        bisa dipakai untuk search-as-you-type, hasil diurutkan berdasarkan ``ts_rank``.
+        :param data:
+        :return:
+        """
+        words = re.findall(r"\w+", data.q)
+        if not words:
+            return SearchAnimeResponse(q=data.q, page=data.page, per_page=data.per_page, data=[])
+
+        ts_query = func.to_tsquery('simple', " & ".join(f"{word}:*" for word in words))
+        rank = func.ts_rank(AnimesModel.c.search_vector, ts_query)
+
+        query = (
+            select(
+                AnimesModel.c.id,
+                AnimesModel.c.title,
+                AnimesModel.c.status,
+                AnimesModel.c.banner,
+                AnimesModel.c.genres,
+                AnimesModel.c.released_year,
+            ).select_from(
+                AnimesModel
+            ).where(
+                AnimesModel.c.search_vector.op('@@')(ts_query)
+            ).order_by(
+                desc(rank),
+                desc(AnimesModel.c.id)
+            ).limit(data.per_page).offset((data.page - 1) * data.per_page)
+        )
+
+        res = (await self.conn.execute(query)).fetchall()
+
+        return SearchAnimeResponse(
+            q=data.q,
             page=data.page,
             per_page=data.per_page,
             data=[
@@ -352,12 +603,55 @@ class AdminCRUD:
             ]
         )
 
+    async def anime_version(self, anime_id: int) -> int:
+        """
+        ``updated_at`` satu anime, untuk ETag/Last-Modified tanpa membaca kolom berat
+
+        Kalau detail anime ada di ``anime_detail_cache``, tidak ada query sama sekali.
+        :param anime_id:
+        :return:
+        """
+        cached = anime_detail_cache.get(anime_id)
+        if cached is not None:
+            return cached.updated_at
+
+        query = select(AnimesModel.c.updated_at).where(AnimesModel.c.id == anime_id)
+
+        data = (await self.conn.execute(query)).first()
+        if data is None:
+            raise AnimeNotFoundError
+
+        return data.updated_at
+
+    async def catalog_version(self) -> Tuple[int, int]:
+        """
+        versi listing: ``updated_at`` terbaru (index-only lewat ix_animes_updated_at) dan revision katalog
+
+        ``updated_at`` hanya per detik, jadi dua batch ingest di detik yang sama tidak
+        mengubahnya; revision dari ``catalog_revision`` naik di setiap transaksi ingest
+        yang mengubah anime dan dipakai untuk ETag. ``updated_at`` untuk Last-Modified.
+        :return: ``(last_modified, revision)``
+        """
+        query = select(
+            select(func.max(AnimesModel.c.updated_at)).scalar_subquery(),
+            select(CatalogRevisionModel.c.revision).where(CatalogRevisionModel.c.id == 1).scalar_subquery(),
+        )
+
+        last_modified, revision = (await self.conn.execute(query)).one()
+        return last_modified or 0, revision or 0
+
     async def detail_anime(self, anime_id: int) -> DetailAnimeResponseSchema:
         """
         Animex Detail
+
+        Hasil di-cache per ``anime_id`` di ``anime_detail_cache``.
         :param anime_id:
         :return:
         """
+        cached = anime_detail_cache.get(anime_id)
+        if cached is not None:
+            return cached
+
         query = (
             select(
                 AnimesModel.c.id,
@@ -371,8 +665,8 @@ class AdminCRUD:
                 AnimesModel.c.updated_on,
                 AnimesModel.c.banner,
                 AnimesModel.c.sinopsis,
-                AnimesModel.c.episodes,
                 AnimesModel.c.genres,
+                AnimesModel.c.updated_at,
 
             )
         ).select_from(
@@ -381,8 +675,12 @@ class AdminCRUD:
 
 
         data = (await self.conn.execute(query)).first()
+        if data is None:
+            raise AnimeNotFoundError
 
-        return DetailAnimeResponseSchema(
+        episode_count, latest_episode = await EpisodeService(self.conn).summary(anime_id)
+
+        detail = DetailAnimeResponseSchema(
             id=data.id,
             title=data.title,
             status=data.status,
@@ -393,12 +691,46 @@ class AdminCRUD:
             posted_by=data.posted_by,
             updated_on=data.updated_on,
             genres=data.genres,
-            episodes=data.episodes,
             banner=data.banner,
             sinopsis=data.sinopsis,
+            updated_at=data.updated_at,
+            episode_count=episode_count,
+            latest_episode=latest_episode,
         )
+
+        anime_detail_cache.set(anime_id, detail)
+
+        return detail
     
 
+    async def listing_episodes(self, anime_id: int, data: FilterEpisodes) -> EpisodeListingResponse:
+        """
+        Listing episode satu anime per halaman
+        :param anime_id:
+        :param data:
+        :return:
+        """
+        return await EpisodeService(self.conn).listing(anime_id, data)
+
+    async def known_episodes(self, title: str) -> KnownEpisodesSchema:
+        """
+        Episode yang sudah lengkap untuk satu title, dipakai crawler untuk melewati
+        halaman episode yang tidak perlu dibuka lagi
+        :param title: title persis seperti yang dikirim crawler
+        :return: ``anime_id`` kosong kalau title belum ada
+        """
+        anime_id = (await self.conn.execute(
+            select(AnimesModel.c.id).where(AnimesModel.c.title == title)
+        )).scalar()
+        if anime_id is None:
+            return KnownEpisodesSchema(title=title)
+
+        return KnownEpisodesSchema(
+            title=title,
+            anime_id=anime_id,
+            numbers=await EpisodeService(self.conn).resolved_numbers(anime_id),
+        )
+
     async def add_crawler_settings(self, data: AddCrawlerSettingsSchema) -> bool:
          """
          Method for add crawler settings
@@ -0,0 +1,39 @@
+from typing import List
+
+from sqlalchemy import or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from models.animes import AnimesModel
+from schemas.admin import FilterAnime, GenreModeEnum
+
+
+def anime_filter_conditions(data: FilterAnime) -> List[ColumnElement]:
+    """
+    kondisi WHERE untuk filter listing anime
+
+    Dipakai bersama oleh query listing dan query total supaya keduanya selalu
+    menghitung himpunan row yang sama.
+    :param data:
+    :return:
+    """
+    conditions = []
+
+    if data.status:
+        conditions.append(AnimesModel.c.status == data.status)
+
+    genres = data.genre_list()
+    if genres:
+        # index ix_animes_genres pakai jsonb_path_ops yang hanya melayani ``@>``,
+        # jadi mode "any" ditulis sebagai OR dari beberapa containment, bukan ``?|``
+        if data.genre_mode == GenreModeEnum.any and len(genres) > 1:
+            conditions.append(or_(*(AnimesModel.c.genres.contains([name]) for name in genres)))
+        else:
+            conditions.append(AnimesModel.c.genres.contains(genres))
+
+    if data.type:
+        conditions.append(AnimesModel.c.type == data.type)
+
+    if data.search:
+        conditions.append(AnimesModel.c.title.ilike(f"%{data.search}%"))
+
+    return conditions
@@ -0,0 +1,83 @@
+import json
+from typing import Optional, Tuple
+
+import attrs
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from core.cache import anime_totals_cache
+from models.animes import AnimesModel
+from schemas.admin import FilterAnime
+from services.anime_filters import anime_filter_conditions
+
+
+class _Explain(Executable, ClauseElement):
+    """
+    ``EXPLAIN (FORMAT JSON)`` untuk statement lain, bind parameter tetap di-bind
+    """
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+@attrs.define
+class AnimeTotals:
+    """
+    total listing anime per kombinasi filter
+
+    Total exact di-cache di ``anime_totals_cache`` dan di-clear oleh write ke animes.
+    Untuk filter ``search`` (``ILIKE '%term%'``) jumlah kombinasi tidak terbatas dan
+    count-nya mahal, jadi dipakai estimasi row dari planner. Tanpa filter sama sekali
+    dipakai ``pg_class.reltuples``: cache-nya di-clear setiap batch ingest, dan
+    ``count(*)`` seluruh tabel terus-menerus selama crawl justru yang mau dihindari.
+    """
+    conn: AsyncConnection
+
+    async def count(self, data: FilterAnime) -> Tuple[int, bool]:
+        """
+        total row untuk filter ``data``
+        :param data:
+        :return: ``(total, is_estimate)``
+        """
+        genres = tuple(data.genre_list())
+        key = (data.status, genres, data.genre_mode if len(genres) > 1 else None, data.type, data.search)
+        cached = anime_totals_cache.get(key)
+        if cached is not None:
+            return cached
+
+        conditions = anime_filter_conditions(data)
+
+        if data.search:
+            result = (await self._estimate(conditions), True)
+        elif not conditions and (estimate := await self._table_estimate()) is not None:
+            result = (estimate, True)
+        else:
+            query = select(func.count()).select_from(AnimesModel).where(*conditions)
+            result = ((await self.conn.execute(query)).scalar(), False)
+
+        anime_totals_cache.set(key, result)
+        return result
+
+    async def _table_estimate(self) -> Optional[int]:
+        # reltuples -1 (belum pernah di-VACUUM/ANALYZE) atau 0 tidak bisa dipercaya, pakai count exact
+        query = text("SELECT reltuples FROM pg_class WHERE oid = 'animes'::regclass")
+        reltuples = (await self.conn.execute(query)).scalar()
+
+        return int(reltuples) if reltuples and reltuples > 0 else None
+
+    async def _estimate(self, conditions) -> int:
+        query = select(AnimesModel.c.id).where(*conditions)
+        plan = (await self.conn.execute(_Explain(query))).scalar()
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,132 @@
+import asyncio
+import functools
+import logging
+from typing import Any, Dict, Tuple
+
+import attrs
+
+from api.config import cfg
+from core.cache import episode_video_cache
+from core.db import engine
+from core.invalidation import invalidation_bus, InvalidationEvent, InvalidationKind
+from exceptions import EpisodeVideoUnavailableError
+from helpers.video_url import extract_iframe_src, fetch_page
+from schemas.admin import EpisodeVideoSchema
+from services.episodes import EpisodeService
+
+logger = logging.getLogger(__name__)
+
+# penanda di cache untuk episode yang gagal di-resolve, supaya tidak di-fetch ulang terus
+UNAVAILABLE = ""
+
+
+@attrs.define(slots=False)
+class EpisodeVideoResolver:
+    """
+    resolve ``video_url`` episode saat pertama kali diminta penonton
+
+    Crawler boleh hanya mengirim metadata; halaman episode baru dibuka di sini, dengan
+    ``extract_iframe_src`` yang juga dipakai ``scrape_episode_details`` crawler. Hasilnya
+    di-cache per ``(anime_id, number)`` dan (kalau ``persist``) disimpan ke tabel episodes
+    supaya worker lain cukup membaca database. Request bersamaan untuk episode yang sama
+    menunggu satu fetch yang sama.
+    """
+    timeout: float = 10.0
+    cache_ttl: float = 3600.0
+    failure_ttl: float = 60.0
+    persist: bool = True
+    max_fetches: int = 8
+    fetched: int = attrs.field(default=0, init=False)
+    shared: int = attrs.field(default=0, init=False)
+    failed: int = attrs.field(default=0, init=False)
+    _inflight: Dict[Tuple[int, str], asyncio.Task] = attrs.field(factory=dict, init=False)
+    _fetch_slots: asyncio.Semaphore = attrs.field(init=False)
+
+    def __attrs_post_init__(self):
+        # fetch ke situs sumber dibatasi, supaya banyak episode baru sekaligus tidak
+        # menghabiskan thread pool default dan membanjiri situs sumber
+        self._fetch_slots = asyncio.Semaphore(self.max_fetches)
+
+    async def resolve(self, anime_id: int, number: str) -> EpisodeVideoSchema:
+        """
+        video url satu episode, dari cache, database, atau halaman sumbernya
+
+        :param anime_id:
+        :param number: nomor episode persis seperti di listing episode
+        :raise EpisodeNotFoundError: kalau episode tidak ada
+        :raise EpisodeVideoUnavailableError: kalau video url tidak bisa di-resolve
+        """
+        key = (anime_id, number)
+        video_url = episode_video_cache.get(key)
+
+        if video_url is None:
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.create_task(self._load(anime_id, number))
+                self._inflight[key] = task
+                task.add_done_callback(functools.partial(self._finished, key))
+            else:
+                self.shared += 1
+            # request yang dibatalkan tidak ikut membatalkan fetch milik request lain
+            video_url = await asyncio.shield(task)
+
+        if video_url == UNAVAILABLE:
+            raise EpisodeVideoUnavailableError
+
+        return EpisodeVideoSchema(anime_id=anime_id, number=number, video_url=video_url)
+
+    def _finished(self, key: Tuple[int, str], task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # error sudah diteruskan ke request yang menunggu, cegah log "never retrieved"
+            task.exception()
+
+    async def _load(self, anime_id: int, number: str) -> str:
+        key = (anime_id, number)
+
+        async with engine.begin() as conn:
+            url, video_url = await EpisodeService(conn).video_source(anime_id, number)
+
+        if video_url:
+            episode_video_cache.set(key, video_url, ttl=self.cache_ttl)
+            return video_url
+
+        video_url = None
+        if url:
+            self.fetched += 1
+            try:
+                async with self._fetch_slots:
+                    html = await asyncio.to_thread(fetch_page, url, self.timeout)
+                video_url = extract_iframe_src(html)
+            except (OSError, ValueError, LookupError):
+                logger.warning("resolving video url of %s failed", url, exc_info=True)
+
+        if not video_url:
+            self.failed += 1
+            episode_video_cache.set(key, UNAVAILABLE, ttl=self.failure_ttl)
+            return UNAVAILABLE
+
+        if self.persist:
+            # store_video_url menaikkan updated_at anime, jadi ETag detail ikut berubah
+            async with engine.begin() as conn:
+                if await EpisodeService(conn).store_video_url(anime_id, number, video_url):
+                    await invalidation_bus.publish(conn, InvalidationEvent(InvalidationKind.anime, [anime_id]))
+
+        episode_video_cache.set(key, video_url, ttl=self.cache_ttl)
+        return video_url
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "inflight": len(self._inflight),
+            "fetched": self.fetched,
+            "shared": self.shared,
+            "failed": self.failed,
+        }
+
+
+episode_video_resolver = EpisodeVideoResolver(
+    timeout=cfg.video.resolve_timeout,
+    cache_ttl=cfg.video.cache_ttl,
+    persist=cfg.video.persist,
+    max_fetches=cfg.video.max_fetches,
+)
@@ -0,0 +1,268 @@
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import attrs
+from sqlalchemy import select, func, desc, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from exceptions import InvalidCursorError, EpisodeNotFoundError
+from helpers.pagination import encode_cursor, decode_cursor
+from models.animes import AnimesModel
+from models.episodes import EpisodesModel
+from schemas.admin import EpisodeResponseSchema, EpisodeListingResponse, FilterEpisodes
+
+# asyncpg membatasi 32767 bind parameter per statement
+UPSERT_CHUNK = 1000
+
+# kolom yang di-merge: nilai kosong dari crawler tidak menimpa nilai yang sudah ada
+MERGED_COLUMNS = ("title", "url", "video_url", "date")
+
+
+def episode_sort_order(number: str) -> float:
+    """
+    angka pertama di nomor episode (``"12"``, ``"12.5"``, ``"Episode 3 END"``), 0 kalau tidak ada
+    """
+    match = re.search(r"\d+(?:\.\d+)?", number)
+
+    return float(match.group()) if match else 0.0
+
+
+def _clip(value: Any, length: int) -> Optional[str]:
+    return str(value)[:length] if value is not None else None
+
+
+def episode_rows(anime_id: int, episodes: Any) -> List[Dict[str, Any]]:
+    """
+    normalisasi payload ``AnimeBase.episodes`` menjadi row tabel episodes
+
+    Episode tanpa ``number`` dilewati; kalau satu nomor muncul lebih dari sekali,
+    yang terakhir dipakai.
+    :param anime_id:
+    :param episodes: list dict episode dari crawler (atau satu dict)
+    :return:
+    """
+    if isinstance(episodes, dict):
+        episodes = [episodes]
+
+    now = int(datetime.utcnow().timestamp())
+    rows: Dict[str, Dict[str, Any]] = {}
+    for episode in episodes or []:
+        if not isinstance(episode, dict):
+            continue
+
+        number = str(episode.get('number') or '').strip()[:50]
+        if not number:
+            continue
+
+        rows[number] = {
+            "anime_id": anime_id,
+            "number": number,
+            "sort_order": episode_sort_order(number),
+            "title": _clip(episode.get('title'), 255),
+            "url": _clip(episode.get('url'), 500),
+            "video_url": episode.get('video_url'),
+            "date": _clip(episode.get('date'), 100),
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    return list(rows.values())
+
+
+@attrs.define
+class EpisodeService:
+    conn: AsyncConnection
+
+    async def upsert(self, anime_id: int, episodes: Any) -> int:
+        """
+        merge episode per ``(anime_id, number)``
+
+        Episode yang tidak ada di payload tidak dihapus.
+        :param anime_id:
+        :param episodes:
+        :return: jumlah episode yang benar-benar di-insert/di-update
+        """
+        return len(await self.upsert_rows(episode_rows(anime_id, episodes)))
+
+    async def upsert_rows(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """
+        merge row episode (boleh dari beberapa anime sekaligus)
+
+        Field yang kosong di payload tidak menimpa nilai lama, dan row yang isinya
+        sama persis tidak ditulis ulang, jadi payload yang hanya berisi episode
+        baru cukup untuk update.
+        :param rows: hasil ``episode_rows``
+        :return: ``anime_id`` untuk setiap row yang di-insert/di-update
+        """
+        written: List[int] = []
+
+        for start in range(0, len(rows), UPSERT_CHUNK):
+            query = insert(EpisodesModel).values(rows[start:start + UPSERT_CHUNK])
+            merged = {
+                name: func.coalesce(query.excluded[name], EpisodesModel.c[name])
+                for name in MERGED_COLUMNS
+            }
+            query = query.on_conflict_do_update(
+                constraint='uq_episodes_anime_number',
+                set_={
+                    "sort_order": query.excluded.sort_order,
+                    "updated_at": query.excluded.updated_at,
+                    **merged,
+                },
+                where=or_(
+                    EpisodesModel.c.sort_order.is_distinct_from(query.excluded.sort_order),
+                    *(EpisodesModel.c[name].is_distinct_from(value) for name, value in merged.items())
+                )
+            ).returning(EpisodesModel.c.anime_id)
+
+            written.extend((await self.conn.execute(query)).scalars())
+
+        return written
+
+    async def summary(self, anime_id: int) -> Tuple[int, Optional[EpisodeResponseSchema]]:
+        """
+        jumlah episode dan episode terbaru, dalam satu query lewat ix_episodes_anime_order
+        :param anime_id:
+        :return: ``(episode_count, latest_episode)``
+        """
+        query = (
+            select(
+                EpisodesModel.c.number,
+                EpisodesModel.c.title,
+                EpisodesModel.c.url,
+                EpisodesModel.c.video_url,
+                EpisodesModel.c.date,
+                func.count().over().label('episode_count'),
+            ).where(
+                EpisodesModel.c.anime_id == anime_id
+            ).order_by(
+                desc(EpisodesModel.c.sort_order),
+                desc(EpisodesModel.c.number)
+            ).limit(1)
+        )
+
+        row = (await self.conn.execute(query)).first()
+        if row is None:
+            return 0, None
+
+        return row.episode_count, EpisodeResponseSchema(
+            number=row.number,
+            title=row.title,
+            url=row.url,
+            video_url=row.video_url,
+            date=row.date,
+        )
+
+    async def resolved_numbers(self, anime_id: int) -> List[str]:
+        """
+        nomor episode yang sudah punya ``video_url``, crawler tidak perlu membuka halamannya lagi
+        :param anime_id:
+        :return:
+        """
+        query = select(EpisodesModel.c.number).where(
+            EpisodesModel.c.anime_id == anime_id,
+            EpisodesModel.c.video_url.is_not(None),
+        )
+
+        return list((await self.conn.execute(query)).scalars())
+
+    async def video_source(self, anime_id: int, number: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        url halaman dan ``video_url`` yang tersimpan untuk satu episode
+        :param anime_id:
+        :param number:
+        :return: ``(url, video_url)``
+        :raise EpisodeNotFoundError:
+        """
+        query = select(EpisodesModel.c.url, EpisodesModel.c.video_url).where(
+            EpisodesModel.c.anime_id == anime_id,
+            EpisodesModel.c.number == number,
+        )
+
+        row = (await self.conn.execute(query)).first()
+        if row is None:
+            raise EpisodeNotFoundError
+
+        return row.url, row.video_url
+
+    async def store_video_url(self, anime_id: int, number: str, video_url: str) -> bool:
+        """
+        simpan ``video_url`` hasil resolve, hanya kalau belum diisi crawler
+
+        ``updated_at`` anime ikut dinaikkan di transaksi yang sama supaya ETag detail berubah;
+        minimal +1 detik, karena resolve bisa terjadi di detik yang sama dengan ingest.
+        :param anime_id:
+        :param number:
+        :param video_url:
+        :return: ``True`` kalau row di-update
+        """
+        query = EpisodesModel.update().where(
+            EpisodesModel.c.anime_id == anime_id,
+            EpisodesModel.c.number == number,
+            EpisodesModel.c.video_url.is_(None),
+        ).values(video_url=video_url)
+
+        if (await self.conn.execute(query)).rowcount == 0:
+            return False
+
+        now = int(datetime.utcnow().timestamp())
+        await self.conn.execute(
+            AnimesModel.update()
+            .where(AnimesModel.c.id == anime_id)
+            .values(updated_at=func.greatest(AnimesModel.c.updated_at + 1, now))
+        )
+        return True
+
+    async def listing(self, anime_id: int, data: FilterEpisodes) -> EpisodeListingResponse:
+        """
+        episode satu anime, urut nomor naik, dengan keyset pagination
+        :param anime_id:
+        :param data:
+        :return:
+        """
+        query = (
+            select(
+                EpisodesModel.c.number,
+                EpisodesModel.c.sort_order,
+                EpisodesModel.c.title,
+                EpisodesModel.c.url,
+                EpisodesModel.c.video_url,
+                EpisodesModel.c.date,
+            ).where(
+                EpisodesModel.c.anime_id == anime_id
+            ).order_by(
+                EpisodesModel.c.sort_order,
+                EpisodesModel.c.number
+            ).limit(data.per_page)
+        )
+
+        if data.cursor:
+            sort_order, number = decode_cursor(data.cursor, 2)
+            if not isinstance(sort_order, (int, float)) or not isinstance(number, str):
+                raise InvalidCursorError
+            query = query.where(
+                tuple_(EpisodesModel.c.sort_order, EpisodesModel.c.number) > tuple_(sort_order, number)
+            )
+
+        res = (await self.conn.execute(query)).fetchall()
+
+        next_cursor = None
+        if res and len(res) == data.per_page:
+            next_cursor = encode_cursor([res[-1].sort_order, res[-1].number])
+
+        return EpisodeListingResponse(
+            anime_id=anime_id,
+            per_page=data.per_page,
+            data=[
+                EpisodeResponseSchema(
+                    number=row.number,
+                    title=row.title,
+                    url=row.url,
+                    video_url=row.video_url,
+                    date=row.date,
+                ) for row in res
+            ],
+            next_cursor=next_cursor,
+        )
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import attrs
+
+from api.config import cfg
+from core.db import engine
+from exceptions import IngestQueueFullError
+from schemas.admin import AnimeBase, IngestQueuedSchema
+from services.admin import AdminCRUD
+
+logger = logging.getLogger(__name__)
+
+
+def _episode_list(data: AnimeBase) -> list:
+    if isinstance(data.episodes, list):
+        return data.episodes
+    return [data.episodes] if data.episodes else []
+
+
+@attrs.define(slots=False)
+class IngestQueue:
+    """
+    antrian in-process untuk submission anime dari crawler
+
+    ``/admin/add-anime`` cukup memasukkan data ke sini lalu langsung balas 202.
+    Worker background menulis ke Postgres lewat ``AdminCRUD.ingest_batch`` per
+    ``batch_size`` item atau setiap ``flush_interval`` detik, mana yang duluan.
+    Submission dengan title yang sama selama masih antri digabung: metadata terakhir
+    yang menang, episode-nya disambung. Antrian ini per-proses dan isinya hilang kalau
+    worker mati sebelum flush, crawler akan mengirim ulang di run berikutnya.
+    """
+    max_pending: int = 5000
+    batch_size: int = 200
+    flush_interval: float = 1.0
+    submitted: int = attrs.field(default=0, init=False)
+    coalesced: int = attrs.field(default=0, init=False)
+    rejected: int = attrs.field(default=0, init=False)
+    written: int = attrs.field(default=0, init=False)
+    failed: int = attrs.field(default=0, init=False)
+    flushes: int = attrs.field(default=0, init=False)
+    last_flush_ms: float = attrs.field(default=0.0, init=False)
+    max_flush_ms: float = attrs.field(default=0.0, init=False)
+    _flush_ms_total: float = attrs.field(default=0.0, init=False)
+    _pending: "OrderedDict[str, AnimeBase]" = attrs.field(factory=OrderedDict, init=False)
+    _queued_at: Dict[str, float] = attrs.field(factory=dict, init=False)
+    _wakeup: Optional[asyncio.Event] = attrs.field(default=None, init=False)
+    _task: Optional[asyncio.Task] = attrs.field(default=None, init=False)
+
+    def submit(self, data: AnimeBase) -> IngestQueuedSchema:
+        """
+        masukkan satu anime ke antrian
+
+        :param data: anime dari crawler
+        :return: posisi antrian saat ini
+        :raise IngestQueueFullError: kalau antrian penuh, ``retry_after`` berisi perkiraan detik
+        """
+        previous = self._pending.get(data.title)
+        if previous is None and len(self._pending) >= self.max_pending:
+            self.rejected += 1
+            raise IngestQueueFullError(self.retry_after())
+
+        self.submitted += 1
+        if previous is not None:
+            self.coalesced += 1
+            data = data.model_copy(update={"episodes": _episode_list(previous) + _episode_list(data)})
+        else:
+            self._queued_at[data.title] = time.monotonic()
+        self._pending[data.title] = data
+
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+        return IngestQueuedSchema(title=data.title, coalesced=previous is not None, depth=len(self._pending))
+
+    def retry_after(self) -> int:
+        """
+        perkiraan detik sampai antrian cukup kosong untuk menerima submission lagi
+        """
+        batches = math.ceil(len(self._pending) / self.batch_size)
+        latency = max(self.flush_interval, self.last_flush_ms / 1000)
+        return max(1, math.ceil(batches * latency))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        hentikan worker dan tulis semua yang masih antri
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        while self._pending:
+            await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            while self._pending:
+                await self.flush()
+                if len(self._pending) < self.batch_size:
+                    break
+
+    async def flush(self) -> None:
+        """
+        tulis maksimal ``batch_size`` item terdepan ke database
+
+        Kalau satu batch gagal, item-nya dicoba ulang satu per satu supaya satu data
+        rusak tidak membuang seluruh batch.
+        """
+        batch: List[AnimeBase] = []
+        while self._pending and len(batch) < self.batch_size:
+            title, data = self._pending.popitem(last=False)
+            self._queued_at.pop(title, None)
+            batch.append(data)
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        try:
+            async with engine.begin() as conn:
+                await AdminCRUD(conn).ingest_batch(batch)
+            self.written += len(batch)
+        except Exception:
+            logger.exception("ingest batch of %d failed, retrying per item", len(batch))
+            for data in batch:
+                try:
+                    async with engine.begin() as conn:
+                        await AdminCRUD(conn).ingest_batch([data])
+                    self.written += 1
+                except Exception:
+                    logger.exception("ingest of %r failed, dropped", data.title)
+                    self.failed += 1
+
+        elapsed = (time.perf_counter() - started) * 1000
+        self.flushes += 1
+        self.last_flush_ms = elapsed
+        self.max_flush_ms = max(self.max_flush_ms, elapsed)
+        self._flush_ms_total += elapsed
+
+    def status(self) -> Dict[str, Any]:
+        """
+        kedalaman antrian, counter dan latency flush untuk monitoring
+        """
+        oldest = next(iter(self._queued_at.values()), None)
+
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "depth": len(self._pending),
+            "max_pending": self.max_pending,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "oldest_pending_seconds": round(time.monotonic() - oldest, 3) if oldest is not None else 0.0,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": round(self._flush_ms_total / self.flushes, 2) if self.flushes else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 2),
+        }
+
+
+ingest_queue = IngestQueue(
+    max_pending=cfg.ingest.max_pending,
+    batch_size=cfg.ingest.batch_size,
+    flush_interval=cfg.ingest.flush_interval,
+)
@@ -0,0 +1,36 @@
+from core.cache import site_settings_cache
+from core.db import engine
+from core.invalidation import invalidation_bus, InvalidationKind
+from schemas.admin import AdminSettingsResponseSchema
+from services.admin import AdminCRUD
+
+# settings yang dibaca frontend di setiap render
+DEFAULT_SETTING_ID = 1
+
+
+async def reload_site_settings(keys: tuple = ()) -> None:
+    """
+    buang cache site settings lalu isi ulang dari database
+
+    Dipanggil dari invalidation bus saat settings berubah dan setelah flush total,
+    supaya endpoint ``/admin/settings`` tidak perlu ke database di jalur baca.
+    """
+    site_settings_cache.clear()
+    async with engine.begin() as conn:
+        await AdminCRUD(conn).load_setting(DEFAULT_SETTING_ID)
+
+
+async def get_site_settings(setting_id: int = DEFAULT_SETTING_ID) -> AdminSettingsResponseSchema:
+    """
+    site settings dari cache, hanya buka koneksi database kalau cache kosong
+    """
+    cached = site_settings_cache.get(setting_id)
+    if cached is not None:
+        return cached
+
+    async with engine.begin() as conn:
+        return await AdminCRUD(conn).load_setting(setting_id)
+
+
+invalidation_bus.subscribe(InvalidationKind.site_settings, reload_site_settings)
+invalidation_bus.on_flush(reload_site_settings)
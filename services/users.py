@@ -1,16 +1,21 @@
 import time
-from typing import List
+from typing import List, Optional
 import attrs
 from sqlalchemy.ext.asyncio import AsyncConnection
-from sqlalchemy import select
+from sqlalchemy import select, any_, bindparam, BigInteger, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from core.cache import user_principal_cache
+from core.invalidation import invalidation_bus, InvalidationEvent, InvalidationKind
 from core.db import engine
 from api.config import cfg
-from exceptions import UserAlreadyExistsError, UserNotFoundError, UserPasswordError
+from exceptions import UserAlreadyExistsError, UserNotFoundError, UserPasswordError, InvalidCursorError
 from helpers.authentication import BasicSalt, PasswordHasher
+from helpers.pagination import encode_cursor, decode_cursor
 from models.bookmarks import BookmarksModel
 from models.animes import AnimesModel
 from models.users import UserModel
-from schemas.users import ListingBookmarksSchema, BookmarkResponseSchema, UserLoginSchema, UserRegisterSchema, UserUpdateSchema
+from schemas.users import AddBookmarkSchema, BookmarkListingResponse, CompactBookmarkSchema, FilterBookmarks, BookmarkBulkAddResponseSchema, BookmarkBulkRemoveResponseSchema, ListingBookmarksSchema, BookmarkResponseSchema, UserLoginSchema, UserRegisterSchema, UserUpdateSchema, \
+    UserPrincipalSchema
 import uuid
 
 @attrs.define
@@ -33,7 +38,7 @@ class UserService:
             raise UserAlreadyExistsError
 
         hasher = PasswordHasher(BasicSalt(cfg.password.salt))
-        password_hash = hasher.hash(user.password)
+        password_hash = await hasher.hash_async(user.password)
 
         query = UserModel.insert().values(
             email=user.email,
@@ -62,7 +67,7 @@ class UserService:
         if result is None:
             raise UserNotFoundError
         
-        if not hasher.verify(user.password, result.password):
+        if not await hasher.verify_async(user.password, result.password):
             raise UserPasswordError
         
         return str(result.uuid)
@@ -80,6 +85,36 @@ class UserService:
 
         return result
     
+    async def get_principal(self, uuid: str) -> Optional[UserPrincipalSchema]:
+        """
+        user yang sedang login untuk auth dependency, di-cache per uuid
+
+        :param uuid: uuid dari JWT
+        :return: ``None`` kalau user tidak ada
+        """
+        principal = user_principal_cache.get(uuid)
+        if principal is not None:
+            return principal
+
+        query = (
+            select(
+                UserModel.c.id,
+                UserModel.c.uuid,
+                UserModel.c.email
+            ).where(
+                UserModel.c.uuid == uuid
+            )
+        )
+
+        result = (await self.conn.execute(query)).first()
+        if result is None:
+            return None
+
+        principal = UserPrincipalSchema(id=result.id, uuid=str(result.uuid), email=result.email)
+        user_principal_cache.set(uuid, principal)
+
+        return principal
+
     async def get_user_by_id(self, user_id: int):
         """Get user profile by ID"""
         query = (
@@ -100,11 +135,14 @@ class UserService:
             email=email
         ).where(
             UserModel.c.id == user_id
+        ).returning(
+            UserModel.c.uuid
         )
 
-        result = (await self.conn.execute(query)).rowcount
+        result = (await self.conn.execute(query)).fetchall()
+        await invalidation_bus.publish(self.conn, InvalidationEvent(InvalidationKind.user, [row.uuid for row in result]))
 
-        return result > 0
+        return len(result) > 0
     
     async def change_user_password(self, user_id: int, current_password: str, new_password: str) -> bool:
         """Change user password with verification"""
@@ -120,11 +158,11 @@ class UserService:
         
         # Verify current password
         hasher = PasswordHasher(BasicSalt(cfg.password.salt))
-        if not hasher.verify(current_password, user.password):
+        if not await hasher.verify_async(current_password, user.password):
             return False
         
         # Hash new password
-        new_password_hash = hasher.hash(new_password)
+        new_password_hash = await hasher.hash_async(new_password)
         
         # Update password
         update_query = UserModel.update().values(
@@ -134,6 +172,7 @@ class UserService:
         )
 
         result = (await self.conn.execute(update_query)).rowcount
+        await invalidation_bus.publish(self.conn, InvalidationEvent(InvalidationKind.user, [user.uuid]))
 
         return result > 0
     
@@ -159,6 +198,7 @@ class UserService:
         )
 
         result = (await self.conn.execute(query)).rowcount
+        await invalidation_bus.publish(self.conn, InvalidationEvent(InvalidationKind.user, [user.uuid]))
 
         return result
     
@@ -168,34 +208,74 @@ class UserService:
         )
 
         result = (await self.conn.execute(query)).rowcount
+        await invalidation_bus.publish(self.conn, InvalidationEvent(InvalidationKind.user, [uuid]))
 
         return result
     
     async def add_bookmark(self, user_id: int, url: str, content_id: int) -> int:
-        # Check if bookmark already exists
-        check_query = (
-            select(BookmarksModel.c.id)
-            .where(
-                (BookmarksModel.c.user_id == user_id) & 
-                (BookmarksModel.c.content_id == content_id)
-            )
-        )
-        
-        existing = (await self.conn.execute(check_query)).first()
-        if existing:
-            return existing.id
-        
-        query = BookmarksModel.insert().values(
+        """
+        tambah bookmark dengan satu ``INSERT ... ON CONFLICT DO NOTHING``; kalau sudah ada
+        id bookmark yang lama yang dikembalikan
+        """
+        query = insert(BookmarksModel).values(
             user_id=user_id,
             url=url,
             content_id=content_id,
             created_at=int(time.time())
+        ).on_conflict_do_nothing(
+            index_elements=[BookmarksModel.c.user_id, BookmarksModel.c.content_id]
+        ).returning(
+            BookmarksModel.c.id
         )
 
-        result = (await self.conn.execute(query)).inserted_primary_key[0]
+        inserted = (await self.conn.execute(query)).first()
+        if inserted is None:
+            existing_query = (
+                select(BookmarksModel.c.id)
+                .where(
+                    (BookmarksModel.c.user_id == user_id) &
+                    (BookmarksModel.c.content_id == content_id)
+                )
+            )
+            return (await self.conn.execute(existing_query)).scalar_one()
+
+        return inserted.id
+
+    async def add_bookmarks(self, user_id: int, bookmarks: List[AddBookmarkSchema]) -> BookmarkBulkAddResponseSchema:
+        """
+        tambah banyak bookmark dalam satu transaksi, misalnya import watchlist
+
+        ``content_id`` yang tidak ada di animes masuk ``missing``, yang sudah di-bookmark
+        masuk ``existing``. Kalau ``content_id`` muncul lebih dari sekali, url terakhir yang dipakai.
+        """
+        url_by_content = {bookmark.content_id: bookmark.url for bookmark in bookmarks}
+        if not url_by_content:
+            return BookmarkBulkAddResponseSchema(added=[], existing=[], missing=[])
+
+        anime_query = select(AnimesModel.c.id).where(
+            AnimesModel.c.id == any_(bindparam("content_ids", list(url_by_content), type_=ARRAY(BigInteger)))
+        )
+        found = {row.id for row in (await self.conn.execute(anime_query)).fetchall()}
+
+        added = []
+        if found:
+            now = int(time.time())
+            query = insert(BookmarksModel).values([
+                {"user_id": user_id, "url": url_by_content[content_id], "content_id": content_id, "created_at": now}
+                for content_id in sorted(found)
+            ]).on_conflict_do_nothing(
+                index_elements=[BookmarksModel.c.user_id, BookmarksModel.c.content_id]
+            ).returning(
+                BookmarksModel.c.content_id
+            )
+            added = sorted(row.content_id for row in (await self.conn.execute(query)).fetchall())
+
+        return BookmarkBulkAddResponseSchema(
+            added=added,
+            existing=sorted(found - set(added)),
+            missing=sorted(set(url_by_content) - found),
+        )
 
-        return result
-    
     async def remove_bookmark(self, user_id: int, content_id: int) -> bool:
         query = BookmarksModel.delete().where(
             (BookmarksModel.c.user_id == user_id) & 
@@ -204,6 +284,26 @@ class UserService:
         
         result = (await self.conn.execute(query)).rowcount
         return result > 0
+
+    async def remove_bookmarks(self, user_id: int, content_ids: List[int]) -> BookmarkBulkRemoveResponseSchema:
+        """
+        hapus banyak bookmark dengan satu ``DELETE ... WHERE content_id = ANY(:ids)``
+        """
+        requested = set(content_ids)
+        if not requested:
+            return BookmarkBulkRemoveResponseSchema(removed=[], not_found=[])
+
+        query = BookmarksModel.delete().where(
+            (BookmarksModel.c.user_id == user_id) &
+            (BookmarksModel.c.content_id == any_(
+                bindparam("content_ids", list(requested), type_=ARRAY(BigInteger))
+            ))
+        ).returning(
+            BookmarksModel.c.content_id
+        )
+        removed = {row.content_id for row in (await self.conn.execute(query)).fetchall()}
+
+        return BookmarkBulkRemoveResponseSchema(removed=sorted(removed), not_found=sorted(requested - removed))
     
     async def get_bookmarks(self, user_id: int) -> List[BookmarkResponseSchema]:
         """Get user bookmarks with anime information"""
@@ -241,6 +341,72 @@ class UserService:
             ) for row in result
         ]
     
+    async def listing_bookmarks(self, user_id: int, data: FilterBookmarks) -> BookmarkListingResponse:
+        """
+        bookmark user terbaru dulu, keyset pagination di ``(created_at, id)``
+
+        Mode ``compact`` tidak join ke animes, untuk client yang sudah cache kartu anime.
+        :param user_id:
+        :param data:
+        :return:
+        """
+        columns = [
+            BookmarksModel.c.id,
+            BookmarksModel.c.url,
+            BookmarksModel.c.content_id,
+            BookmarksModel.c.created_at,
+        ]
+        source = BookmarksModel
+        if not data.compact:
+            columns += [AnimesModel.c.title, AnimesModel.c.banner, AnimesModel.c.status]
+            source = BookmarksModel.join(AnimesModel, BookmarksModel.c.content_id == AnimesModel.c.id)
+
+        query = (
+            select(*columns)
+            .select_from(source)
+            .where(BookmarksModel.c.user_id == user_id)
+            .order_by(BookmarksModel.c.created_at.desc(), BookmarksModel.c.id.desc())
+            .limit(data.per_page)
+        )
+
+        if data.cursor:
+            created_at, bookmark_id = decode_cursor(data.cursor, 2)
+            if not isinstance(created_at, int) or not isinstance(bookmark_id, int):
+                raise InvalidCursorError
+            query = query.where(
+                tuple_(BookmarksModel.c.created_at, BookmarksModel.c.id) < tuple_(created_at, bookmark_id)
+            )
+
+        res = (await self.conn.execute(query)).fetchall()
+
+        next_cursor = None
+        if res and len(res) == data.per_page:
+            next_cursor = encode_cursor([res[-1].created_at, res[-1].id])
+
+        if data.compact:
+            items = [
+                CompactBookmarkSchema(
+                    id=row.id,
+                    url=row.url,
+                    content_id=row.content_id,
+                    created_at=row.created_at,
+                ) for row in res
+            ]
+        else:
+            items = [
+                BookmarkResponseSchema(
+                    id=row.id,
+                    url=row.url,
+                    content_id=row.content_id,
+                    created_at=row.created_at,
+                    anime_title=row.title,
+                    anime_banner=row.banner,
+                    anime_status=row.status
+                ) for row in res
+            ]
+
+        return BookmarkListingResponse(per_page=data.per_page, data=items, next_cursor=next_cursor)
+
     async def check_bookmark_exists(self, user_id: int, content_id: int) -> bool:
         """Check if user has bookmarked this anime"""
         query = (
@@ -253,4 +419,25 @@ class UserService:
         
         result = (await self.conn.execute(query)).first()
         return result is not None
-    
\ No newline at end of file
+
+    async def bookmarked_content_ids(self, user_id: int, content_ids: List[int]) -> List[int]:
+        """
+        subset ``content_ids`` yang sudah di-bookmark user, satu query ``= ANY(:ids)``
+        lewat index ``(user_id, content_id)``
+        """
+        if not content_ids:
+            return []
+
+        query = (
+            select(BookmarksModel.c.content_id)
+            .where(
+                (BookmarksModel.c.user_id == user_id) &
+                (BookmarksModel.c.content_id == any_(
+                    bindparam("content_ids", list(set(content_ids)), type_=ARRAY(BigInteger))
+                ))
+            )
+            .distinct()
+        )
+
+        result = (await self.conn.execute(query)).fetchall()
+        return [row.content_id for row in result]